@@ -1,39 +1,432 @@
-from googleapiclient.http import MediaIoBaseDownload
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaIoBaseDownload, set_user_agent, DEFAULT_CHUNK_SIZE
 from .constants import EXPORT_MAP
-import io, os
+import io, os, time, hashlib, threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import httplib2
+import google_auth_httplib2
 from .utils import sanitize
+from .cache import LIST_CACHE
+from .throttle import execute, controller
+from .transport import PooledHttp, pooled
 
-def list_children(svc, parent_id, page_token=None, query_extra=""):
+# googleapiclient appends " (gzip)" itself, which is what makes Google compress responses
+USER_AGENT = "googleClient"
+
+_local = threading.local()
+
+def authorized_http(creds):
+    """
+    Authorized transport that asks for gzip-compressed responses: a pooled,
+    thread-safe transport.PooledHttp, or httplib2 with GC_TRANSPORT=httplib2.
+    """
+    if pooled():
+        return set_user_agent(PooledHttp(creds), USER_AGENT)
+    return set_user_agent(google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http()), USER_AGENT)
+
+def worker_http(svc):
+    """
+    Return an authorized transport the calling thread may use.
+    A pooled transport is shared as is; an httplib2 one is not thread-safe,
+    so each worker thread gets its own.
+    """
+    if isinstance(svc._http, PooledHttp):
+        return svc._http
+    creds = svc._http.credentials
+    pool = getattr(_local, "http", None)
+    if pool is None:
+        pool = _local.http = {}
+    h = pool.get(id(creds))
+    if h is None:
+        h = pool[id(creds)] = authorized_http(creds)
+    return h
+
+# Field projections: callers ask only for what they use.
+# full rows for ls/search views (table, perms, owners); also used for change records
+LIST_FIELDS = (
+    "id,name,mimeType,modifiedTime,size,md5Checksum,owners(emailAddress,displayName),"
+    "permissions(emailAddress,role,displayName,domain),driveId,"
+    "shortcutDetails(targetId,targetMimeType)"
+)
+# traversals (tree, size, mget -r) skip the owners/permissions arrays
+WALK_FIELDS = "id,name,mimeType,size,shortcutDetails(targetId,targetMimeType)"
+# mget also needs what the download journal compares
+DOWNLOAD_FIELDS = WALK_FIELDS + ",md5Checksum,modifiedTime"
+
+def _owner(svc):
+    # cache entries are per impersonated user
+    creds = getattr(getattr(svc, "_http", None), "credentials", None)
+    return getattr(creds, "_subject", None) or id(svc)
+
+def list_children(svc, parent_id, page_token=None, query_extra="", http=None, fields=LIST_FIELDS):
+    key = (_owner(svc), parent_id, query_extra, page_token)
+    hit = LIST_CACHE.get(key, fields)
+    if hit is not None:
+        return hit[0], hit[1]
     q = f"'{parent_id}' in parents and trashed=false"
     if query_extra:
         q = f"({q}) and ({query_extra})"
-    resp = svc.files().list(
+    resp = execute(svc.files().list(
         q=q,
-        fields="nextPageToken, files(id,name,mimeType,modifiedTime,size,owners(emailAddress,displayName),permissions(emailAddress,role,displayName,domain),driveId)",
+        fields=f"nextPageToken, files({fields})",
         includeItemsFromAllDrives=True,
         supportsAllDrives=True,
         corpora="allDrives",
         pageSize=200,
         pageToken=page_token
-    ).execute()
-    return resp.get("files", []), resp.get("nextPageToken")
+    ), http=http)
+    files, token = resp.get("files", []), resp.get("nextPageToken")
+    LIST_CACHE.put(key, [files, token], fields=fields)
+    return files, token
+
+def list_all(svc, parent_id, query_extra="", http=None, fields=LIST_FIELDS):
+    rows, token = [], None
+    while True:
+        batch, token = list_children(svc, parent_id, page_token=token, query_extra=query_extra, http=http, fields=fields)
+        rows.extend(batch)
+        if not token:
+            return rows
+
+META_FIELDS = (
+    "id,name,mimeType,modifiedTime,size,version,webViewLink,driveId,parents,"
+    "owners(emailAddress,displayName),"
+    "permissions(emailAddress,role,displayName,domain),"
+    "shortcutDetails(targetId,targetMimeType,targetResourceKey)"
+)
+
+def _file_pages(svc, fields, q, page_size, **corpus):
+    token = None
+    while True:
+        resp = execute(svc.files().list(
+            q=q,
+            fields=f"nextPageToken, incompleteSearch, files({fields})",
+            includeItemsFromAllDrives=True,
+            supportsAllDrives=True,
+            pageSize=page_size,
+            pageToken=token,
+            **corpus,
+        ))
+        yield resp
+        token = resp.get("nextPageToken")
+        if not token:
+            return
+
+def _drive_ids(svc):
+    token = None
+    while True:
+        resp = execute(svc.drives().list(fields="nextPageToken, drives(id)", pageSize=100, pageToken=token))
+        yield from (d["id"] for d in resp.get("drives", []))
+        token = resp.get("nextPageToken")
+        if not token:
+            return
+
+def iter_files(svc, fields, q="trashed=false", page_size=1000):
+    """
+    Page through every file matching q across all corpora the user can see.
+    Drive may cut an allDrives search short (incompleteSearch); the rest then comes
+    from one query per corpus (the user's own, then each shared drive), skipping
+    files already yielded.
+    """
+    seen = set()
+    for resp in _file_pages(svc, fields, q, page_size, corpora="allDrives"):
+        for f in resp.get("files", []):
+            seen.add(f["id"])
+            yield f
+        if resp.get("incompleteSearch"):
+            break
+    else:
+        return
+    corpora = [{"corpora": "user"}]
+    corpora += ({"corpora": "drive", "driveId": d} for d in _drive_ids(svc))
+    for corpus in corpora:
+        for resp in _file_pages(svc, fields, q, page_size, **corpus):
+            for f in resp.get("files", []):
+                if f["id"] not in seen:
+                    seen.add(f["id"])
+                    yield f
 
 def get_meta(svc, file_id):
-    return svc.files().get(
+    return execute(svc.files().get(
         fileId=file_id,
-        fields=(
-            "id,name,mimeType,modifiedTime,size,webViewLink,driveId,parents,"
-            "owners(emailAddress,displayName),"
-            "permissions(emailAddress,role,displayName,domain),"
-            "shortcutDetails(targetId,targetMimeType,targetResourceKey)"
-        ),
+        fields=META_FIELDS,
         supportsAllDrives=True
-    ).execute()
+    ))
+
+def conditional(req, etag, tags, key):
+    """
+    Send req with If-None-Match: etag (if given) and record the ETag of its
+    response in tags[key]. Works for plain calls and for calls inside a batch;
+    an unchanged resource then fails with HttpError 304 (see not_modified).
+    """
+    if etag:
+        req.headers["If-None-Match"] = etag
+    post = req.postproc
+
+    def postproc(resp, content):
+        if resp.get("etag"):
+            tags[key] = resp["etag"]
+        return post(resp, content)
+
+    req.postproc = postproc
+    return req
+
+def not_modified(e):
+    return isinstance(e, HttpError) and e.resp.status == 304
+
+def output_path(item, outdir="."):
+    """Local path download_file writes item to (item must carry name and mimeType)."""
+    safe_name = sanitize(item["name"])
+    if item["mimeType"] in EXPORT_MAP:
+        return os.path.join(outdir, f"{safe_name}{EXPORT_MAP[item['mimeType']][1]}")
+    root, ext = os.path.splitext(safe_name)
+    return os.path.join(outdir, safe_name if ext else f"{safe_name}.bin")
+
+# Binary files at least this big are fetched as parallel byte ranges (see _ranged_media).
+RANGED_MIN = int(os.environ.get("GC_RANGED_MIN_MB", 64)) << 20
+MAX_SEGMENTS = int(os.environ.get("GC_SEGMENTS", 8))
+START_SEGMENTS = 2
+MIN_PART = 1 << 20
+MAX_PART = 64 << 20
+PART_SECONDS = 2.0      # size each range to take about this long at the rate last seen
+
+class _RangeIgnored(Exception):
+    """The server answered a Range request with the whole file."""
 
-def download_file(svc, item, outdir="."):
+class ChecksumMismatch(IOError):
+    """A downloaded file's MD5 differs from the md5Checksum Drive reports for it."""
+
+class _Hashing:
+    """Write-only file wrapper that feeds every byte written into an MD5."""
+    def __init__(self, fh, md5):
+        self._fh = fh
+        self.md5 = md5
+
+    def write(self, data):
+        self.md5.update(data)
+        return self._fh.write(data)
+
+def _media_headers(req):
+    headers = {k: v for k, v in req.headers.items() if k.lower() not in ("accept", "accept-encoding", "user-agent")}
+    # byte offsets must refer to the stored bytes, not a compressed stream
+    headers["accept-encoding"] = "identity"
+    return headers
+
+def _pwrite(fd, data, offset, lock):
+    if hasattr(os, "pwrite"):
+        os.pwrite(fd, data, offset)
+        return
+    with lock:
+        os.lseek(fd, offset, os.SEEK_SET)
+        os.write(fd, data)
+
+def _pread(fd, n, offset, lock):
+    if hasattr(os, "pread"):
+        return os.pread(fd, n, offset)
+    with lock:
+        os.lseek(fd, offset, os.SEEK_SET)
+        return os.read(fd, n)
+
+def _ranged_media(svc, req, out_path, size, hashed=False):
+    """
+    Download a large binary file as byte ranges fetched on several threads and written
+    in place into out_path. Starts with START_SEGMENTS streams and adds one (up to
+    MAX_SEGMENTS) while the combined rate keeps rising by 10%+; each range is sized to
+    take about PART_SECONDS at its stream's last rate.
+    If the transfer stops early the file is cut back to its contiguous prefix, so the
+    journal resumes it from there. With hashed=True the MD5 follows that prefix as ranges
+    land (a range that arrives ahead of it is read back later) and its hex digest is returned.
+    Raises _RangeIgnored if the server doesn't honour Range (the caller falls back).
+    """
+    headers = _media_headers(req)
+    ctl = controller(req.http)
+    lock, wlock = threading.Lock(), threading.Lock()
+    first = min(MAX_PART, max(MIN_PART, size // (MAX_SEGMENTS * 4)))
+    st = {"next": 0, "part": first, "done": 0, "want": START_SEGMENTS, "best": 0.0}
+    started = time.monotonic()
+    md5, hlock = hashlib.md5(), threading.Lock()
+    landed = {}     # lo -> hi of written ranges past the contiguous prefix
+    frontier = [0]  # end of the contiguous prefix
+
+    def advance(fd, lo, hi, content):
+        with hlock:
+            if lo != frontier[0]:
+                landed[lo] = hi
+                return
+            if hashed:
+                md5.update(content)
+            frontier[0] = hi
+            while frontier[0] in landed:
+                a = frontier[0]
+                b = landed.pop(a)
+                if hashed:
+                    md5.update(_pread(fd, b - a, a, wlock))
+                frontier[0] = b
+
+    def take():
+        with lock:
+            lo = st["next"]
+            if lo >= size:
+                return None
+            hi = min(size, lo + st["part"])
+            st["next"] = hi
+            return lo, hi
+
+    def fetch(http, lo, hi):
+        resp, content = http.request(req.uri, "GET", headers=dict(headers, range=f"bytes={lo}-{hi - 1}"))
+        if resp.status == 200:
+            raise _RangeIgnored(out_path)
+        if resp.status != 206:
+            raise HttpError(resp, content, uri=req.uri)
+        if len(content) != hi - lo:
+            # retryable: the throttle controller fetches the range again
+            raise ConnectionError(f"short range at {lo}: {len(content)} of {hi - lo} bytes")
+        return content
+
+    def adapt(n, secs):
+        with lock:
+            st["done"] += n
+            st["part"] = int(min(MAX_PART, max(MIN_PART, n / max(secs, 1e-3) * PART_SECONDS)))
+            rate = st["done"] / max(time.monotonic() - started, 1e-3)
+            if rate > st["best"] * 1.1 and st["want"] < MAX_SEGMENTS:
+                st["want"] += 1     # the last stream added still paid off
+            st["best"] = max(st["best"], rate)
+
+    def segment(fd):
+        http = worker_http(svc)
+        while True:
+            r = take()
+            if r is None:
+                return
+            t0 = time.monotonic()
+            content = ctl.call(fetch, http, *r)
+            _pwrite(fd, content, r[0], wlock)
+            advance(fd, r[0], r[1], content)
+            adapt(len(content), time.monotonic() - t0)
+
+    fd = os.open(out_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o666)
+    try:
+        # no preallocation: a full-size file would look complete to the journal
+        with ThreadPoolExecutor(max_workers=MAX_SEGMENTS, thread_name_prefix="gC-seg") as ex:
+            running = {ex.submit(segment, fd) for _ in range(min(START_SEGMENTS, MAX_SEGMENTS))}
+            try:
+                while running:
+                    done, running = wait(running, timeout=0.5, return_when=FIRST_COMPLETED)
+                    for f in done:
+                        if f.exception() is not None:
+                            raise f.exception()
+                    with lock:
+                        grow = st["want"] - len(running) if st["next"] < size else 0
+                    running |= {ex.submit(segment, fd) for _ in range(max(0, grow))}
+            finally:
+                with lock:
+                    st["next"] = size    # stop handing out ranges; the executor waits for the rest
+        if st["done"] != size or os.fstat(fd).st_size != size:
+            raise IOError(f"incomplete download: {st['done']} of {size} bytes in {out_path}")
+    finally:
+        if frontier[0] < size:
+            os.ftruncate(fd, frontier[0])   # drop ranges past the first gap
+        os.close(fd)
+    return md5.hexdigest() if hashed else None
+
+def _get_range(req, headers):
+    resp, content = req.http.request(req.uri, "GET", headers=headers)
+    if resp.status not in (200, 206, 416):
+        raise HttpError(resp, content, uri=req.uri)
+    return resp, content
+
+def _resume_media(req, out_path, offset, chunk=DEFAULT_CHUNK_SIZE, hashed=False):
+    """
+    Continue a partial binary download at byte `offset` with HTTP Range requests.
+    With hashed=True returns the whole file's MD5 (the kept prefix is hashed first).
+    """
+    headers = _media_headers(req)
+    md5 = hashlib.md5() if hashed else None
+    fetch = lambda: _get_range(req, headers)
+    ctl = controller(req.http)
+    with open(out_path, "r+b") as fh:
+        left = offset if md5 is not None else 0
+        while left > 0:
+            buf = fh.read(min(left, chunk))
+            if not buf:
+                break
+            md5.update(buf)
+            left -= len(buf)
+        fh.seek(offset)
+        fh.truncate()
+        pos = offset
+        while True:
+            headers["range"] = f"bytes={pos}-{pos + chunk - 1}"
+            resp, content = ctl.call(fetch)
+            if resp.status == 416:
+                break    # nothing left past offset
+            if resp.status == 200 and pos:
+                # server ignored the Range header and sent the whole file
+                fh.seek(0)
+                fh.truncate()
+                pos = 0
+                md5 = hashlib.md5() if hashed else None
+            fh.write(content)
+            if md5 is not None:
+                md5.update(content)
+            pos += len(content)
+            if "content-range" in resp:
+                total = int(resp["content-range"].rsplit("/", 1)[1])
+            else:
+                total = pos
+            if not content or pos >= total:
+                break
+    return md5.hexdigest() if md5 is not None else None
+
+STREAM_CHUNK = 8 << 20
+
+def iter_media(svc, item, http=None, chunk=STREAM_CHUNK, meta=None):
+    """
+    Yield an item's content as byte chunks, writing nothing to disk: the export of a
+    Google-native doc in one piece (Drive caps exports at 10 MB), otherwise the file
+    in Range requests of `chunk` bytes. item must carry id and mimeType.
+    Pass a dict as meta to get the size Drive reports for this download in
+    meta["size"], set before the first chunk is yielded (binary files only).
+    Raises IOError if that size changes part way (the file was replaced meanwhile).
+    """
+    mime = item["mimeType"]
+    if mime in EXPORT_MAP:
+        req = svc.files().export_media(fileId=item["id"], mimeType=EXPORT_MAP[mime][0])
+        if http is not None:
+            req.http = http
+        yield execute(req, http=http)
+        return
+    req = svc.files().get_media(fileId=item["id"])
+    if http is not None:
+        req.http = http
+    headers = _media_headers(req)
+    ctl = controller(req.http)
+    pos = 0
+    while True:
+        headers["range"] = f"bytes={pos}-{pos + chunk - 1}"
+        resp, content = ctl.call(_get_range, req, headers)
+        if resp.status == 416:
+            return   # empty file
+        if resp.status == 200 and pos:
+            raise IOError(f"server ignored Range for {item.get('name') or item['id']} after {pos} bytes")
+        total = int(resp["content-range"].rsplit("/", 1)[1]) if "content-range" in resp else pos + len(content)
+        if meta is not None:
+            if meta.setdefault("size", total) != total:
+                raise IOError(f"{item.get('name') or item['id']} changed size while streaming "
+                              f"({meta['size']} -> {total} bytes)")
+        yield content
+        pos += len(content)
+        if not content or pos >= total:
+            return
+
+def download_file(svc, item, outdir=".", http=None, resume_from=0):
     """
     Download a Drive item to outdir. Handles Google-native docs via export.
     Guarantees: filename available, sanitized, and parent directory exists.
+    Pass http (see worker_http) when calling from a worker thread.
+    resume_from > 0 continues a partial binary file at that byte offset.
+    Binary files of RANGED_MIN bytes or more (by item["size"]) download as parallel ranges.
+    If item carries md5Checksum, the bytes are hashed as they are written and
+    ChecksumMismatch is raised when the result differs (the file is left in place).
     """
     file_id = item["id"]
 
@@ -41,32 +434,51 @@ def download_file(svc, item, outdir="."):
     name = item.get("name")
     mime = item.get("mimeType")
     if not name or not mime:
-        meta = svc.files().get(
+        meta = execute(svc.files().get(
             fileId=file_id,
             fields="id,name,mimeType",
             supportsAllDrives=True,
-        ).execute()
+        ), http=http)
         name = name or meta.get("name") or "untitled"
         mime = mime or meta.get("mimeType") or "application/octet-stream"
 
     # Sanitize filename and ensure output dir exists
-    safe_name = sanitize(name)
+    out_path = output_path({"name": name, "mimeType": mime}, outdir)
     os.makedirs(outdir, exist_ok=True)
 
     # Export vs binary download
     if mime in EXPORT_MAP:
-        export_type, ext = EXPORT_MAP[mime]
-        req = svc.files().export_media(fileId=file_id, mimeType=export_type)
-        out_path = os.path.join(outdir, f"{safe_name}{ext}")
+        req = svc.files().export_media(fileId=file_id, mimeType=EXPORT_MAP[mime][0])
     else:
         req = svc.files().get_media(fileId=file_id)
-        root, ext = os.path.splitext(safe_name)
-        out_path = os.path.join(outdir, safe_name if ext else f"{safe_name}.bin")
+    if http is not None:
+        req.http = http
+
+    # exports are generated on the fly and have no checksum
+    want = item.get("md5Checksum") if mime not in EXPORT_MAP else None
+
+    def check(got):
+        if want and got != want:
+            raise ChecksumMismatch(f"md5 mismatch for {out_path}: got {got}, Drive has {want}")
+        return out_path
+
+    if resume_from and mime not in EXPORT_MAP:
+        return check(_resume_media(req, out_path, resume_from, hashed=bool(want)))
+
+    size = int(item["size"]) if item.get("size") is not None else 0
+    if mime not in EXPORT_MAP and size >= RANGED_MIN:
+        try:
+            return check(_ranged_media(svc, req, out_path, size, hashed=bool(want)))
+        except _RangeIgnored:
+            pass   # fetch it as one stream below
 
+    md5 = hashlib.md5()
     with io.FileIO(out_path, "wb") as fh:
-        downloader = MediaIoBaseDownload(fh, req)
+        downloader = MediaIoBaseDownload(_Hashing(fh, md5) if want else fh, req)
+        ctl = controller(req.http)
         done = False
         while not done:
-            status, done = downloader.next_chunk()
+            # a failed chunk leaves the downloader where it was, so it can simply be retried
+            status, done = ctl.call(downloader.next_chunk)
 
-    return out_path
+    return check(md5.hexdigest())
@@ -0,0 +1,167 @@
+# googleClient/archive.py
+import io, time, tarfile, zipfile
+from datetime import datetime
+
+def archive_format(target):
+    """'zip', 'tar', 'tar.gz' or 'tar.zst' for an --archive target ('-' = tar on stdout)."""
+    name = target.lower()
+    if name.endswith(".zip"):
+        return "zip"
+    if name.endswith((".tar.gz", ".tgz")):
+        return "tar.gz"
+    if name.endswith((".tar.zst", ".tzst")):
+        return "tar.zst"
+    return "tar"
+
+def _mtime(s):
+    try:
+        return datetime.fromisoformat(s.replace("Z", "+00:00")).timestamp()
+    except Exception:
+        return time.time()
+
+class MemberError(IOError):
+    """A member couldn't be streamed whole; the archive itself is still well-formed."""
+
+class _ChunkReader:
+    """
+    read(n) over an iterator of byte chunks, holding one chunk at a time (for tarfile.addfile).
+    Once the chunks run out, or fetching one fails (kept in `error`), reads return zeros
+    up to `size`, so the member still has the length its tar header promised.
+    """
+    def __init__(self, chunks, size):
+        self._it = iter(chunks)
+        self._cur = b""
+        self._pos = 0
+        self._ended = False
+        self.size = size
+        self.got = 0        # bytes that came from the chunks
+        self.padded = 0     # zeros added after them
+        self.error = None
+
+    def _next(self):
+        while not self._ended:
+            try:
+                c = next(self._it, None)
+            except Exception as e:
+                c, self.error = None, e
+            if c is None:
+                self._ended = True
+            elif c:
+                self.got += len(c)
+                return c
+        left = self.size - self.got - self.padded
+        if left <= 0:
+            return b""
+        z = bytes(min(left, 1 << 20))
+        self.padded += len(z)
+        return z
+
+    def more(self):
+        """True if the chunks had data past `size` (tarfile stops reading there)."""
+        if self.padded:
+            return False
+        return self._pos < len(self._cur) or bool(self._next())
+
+    def read(self, n=-1):
+        out = []
+        while n != 0:
+            if self._pos >= len(self._cur):
+                self._cur, self._pos = self._next(), 0
+                if not self._cur:
+                    break
+            take = len(self._cur) - self._pos if n < 0 else min(n, len(self._cur) - self._pos)
+            out.append(self._cur[self._pos:self._pos + take])
+            self._pos += take
+            if n > 0:
+                n -= take
+        return b"".join(out)
+
+class ArchiveWriter:
+    """
+    Streams files into one archive, front to back without seeking, so the target may be
+    a pipe ('-' writes a plain tar to `raw`, the stdout gC --pipe kept aside). The format
+    follows the name (see archive_format); .zst needs the zstandard package.
+    Memory use is one chunk per member. Tar headers carry the size, so members of
+    unknown size (exports) are held whole; Drive caps those at 10 MB.
+    """
+    def __init__(self, target, raw=None):
+        fmt = archive_format(target)
+        zstd = None
+        if fmt == "tar.zst":
+            try:
+                import zstandard as zstd
+            except ImportError:
+                raise ValueError("--archive .tar.zst needs the zstandard package (pip install zstandard)")
+        if target == "-" and raw is None:
+            raise ValueError("--archive - needs a stdout reserved for it (gC --pipe)")
+        fh = self._fh = raw if target == "-" else open(target, "wb")
+        self._own = target != "-"   # close the file we opened; only flush a pipe we were given
+        self._zst = self._tar = self._zip = None
+        if fmt == "zip":
+            self._zip = zipfile.ZipFile(fh, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True)
+            return
+        mode = "w|gz" if fmt == "tar.gz" else "w|"
+        if zstd is not None:
+            fh = self._zst = zstd.ZstdCompressor().stream_writer(fh, closefd=False)
+        self._tar = tarfile.open(fileobj=fh, mode=mode, format=tarfile.PAX_FORMAT)
+
+    def add(self, name, chunks, size=None, modified=None):
+        """
+        Add a member from an iterable of byte chunks. size=None means unknown.
+        If the chunks fail or don't match `size`, MemberError is raised once the member
+        is closed, leaving the archive usable: an unknown-size member is left out, a tar
+        member is zero-padded or cut to its header's size, a zip member keeps what came.
+        Errors writing the archive itself propagate as they are.
+        """
+        mtime = _mtime(modified) if modified else time.time()
+        if self._zip is not None:
+            info = zipfile.ZipInfo(name, date_time=time.localtime(max(mtime, 315532800))[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            got, error = 0, None
+            with self._zip.open(info, "w", force_zip64=True) as out:
+                it = iter(chunks)
+                while True:
+                    try:
+                        c = next(it, None)
+                    except Exception as e:
+                        error = e
+                        break
+                    if c is None:
+                        break
+                    out.write(c)
+                    got += len(c)
+            if error is not None:
+                raise MemberError(f"{name}: {error}; its entry holds the first {got} bytes") from error
+            return
+        info = tarfile.TarInfo(name)
+        info.mtime = mtime
+        info.mode = 0o644
+        if size is None:
+            try:
+                data = b"".join(chunks)
+            except Exception as e:
+                raise MemberError(f"{name}: {e}; not added") from e
+            info.size = len(data)
+            self._tar.addfile(info, io.BytesIO(data))
+            return
+        info.size = size
+        reader = _ChunkReader(chunks, size)
+        self._tar.addfile(info, reader)
+        if reader.padded:
+            why = reader.error or "stream ended early"
+            msg = f"{name}: {why} after {reader.got} of {size} bytes; its entry is zero-padded"
+            raise MemberError(msg) from reader.error
+        if reader.more():
+            raise MemberError(f"{name}: more than the {size} bytes expected; its entry is cut there")
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+        if self._tar is not None:
+            self._tar.close()
+        if self._zst is not None:
+            self._zst.close()
+        if self._own:
+            self._fh.close()
+        else:
+            self._fh.flush()
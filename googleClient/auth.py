@@ -1,9 +1,54 @@
-import os, sys, json, base64, stat
+import os, re, sys, json, base64, stat
+from datetime import datetime, timedelta, timezone
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from .constants import SCOPES
+from .api import authorized_http
 
-def build_service(key_file: str | None, user: str):
+# reuse a cached access token only if it has at least this long left
+TOKEN_MARGIN = timedelta(minutes=5)
+
+def _token_path(user):
+    safe_user = re.sub(r'[^A-Za-z0-9_.@-]', '_', user)
+    return os.path.join(os.path.expanduser("~"), ".config", "gC", "tokens", f"{safe_user}.json")
+
+def load_token(delegated) -> bool:
+    """Install the cached access token for delegated's subject if it is still good."""
+    try:
+        with open(_token_path(delegated._subject), encoding="utf-8") as fh:
+            data = json.load(fh)
+        if data.get("sa") != delegated.service_account_email:
+            return False
+        expiry = datetime.fromtimestamp(data["expiry"], timezone.utc)
+    except Exception:
+        return False
+    if expiry - datetime.now(timezone.utc) < TOKEN_MARGIN:
+        return False
+    # google-auth keeps expiry as naive UTC
+    delegated.token, delegated.expiry = data["token"], expiry.replace(tzinfo=None)
+    return True
+
+def save_token(delegated):
+    """Cache delegated's current access token (0600, under ~/.config/gC/tokens)."""
+    if not getattr(delegated, "token", None) or not getattr(delegated, "expiry", None):
+        return
+    path = _token_path(delegated._subject)
+    try:
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump({
+                "sa": delegated.service_account_email,
+                "token": delegated.token,
+                "expiry": delegated.expiry.replace(tzinfo=timezone.utc).timestamp(),
+            }, fh)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+def load_credentials(key_file: str | None):
+    """Service-account credentials from SA_JSON_B64 / SA_JSON env or a 0600 key file (exits on error)."""
     info = None
     if os.environ.get("SA_JSON_B64"):
         info = json.loads(base64.b64decode(os.environ["SA_JSON_B64"]))
@@ -23,9 +68,14 @@ def build_service(key_file: str | None, user: str):
         sys.exit(1)
 
     if info:
-        creds = service_account.Credentials.from_service_account_info(info, scopes=SCOPES)
-    else:
-        creds = service_account.Credentials.from_service_account_file(key_file, scopes=SCOPES)
+        return service_account.Credentials.from_service_account_info(info, scopes=SCOPES)
+    return service_account.Credentials.from_service_account_file(key_file, scopes=SCOPES)
 
-    delegated = creds.with_subject(user)
-    return build("drive", "v3", credentials=delegated)
+def service_for(delegated):
+    # the discovery document bundled with googleapiclient; no network fetch at startup
+    return build("drive", "v3", http=authorized_http(delegated), static_discovery=True, cache_discovery=False)
+
+def build_service(key_file: str | None, user: str):
+    delegated = load_credentials(key_file).with_subject(user)
+    load_token(delegated)
+    return service_for(delegated)
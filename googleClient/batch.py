@@ -0,0 +1,142 @@
+# googleClient/batch.py
+from .api import META_FIELDS, conditional, not_modified
+from .constants import SHORTCUT
+from .throttle import execute, controller, is_retryable, MAX_RETRIES
+
+BATCH_LIMIT = 100   # Drive accepts at most 100 calls per batch request
+
+TARGET_FIELDS = "id,name,mimeType,size,md5Checksum,modifiedTime"
+
+def batch_get(svc, ids, fields, http=None, errors=None):
+    """
+    files().get for many ids using batch requests of up to BATCH_LIMIT calls.
+    Returns {id: metadata}; ids that failed map to None (exception kept in `errors` if given).
+    Calls inside a batch that hit rate limits are retried in a smaller follow-up batch.
+    """
+    return batch_call(svc, ids, lambda fid: svc.files().get(fileId=fid, fields=fields, supportsAllDrives=True),
+                      http=http, errors=errors)
+
+def batch_permissions(svc, ids, fields="permissions(type,role,emailAddress,domain,allowFileDiscovery)",
+                      http=None, errors=None):
+    """
+    permissions().list for many file ids, batched like batch_get. Returns {id: [permission, ...] or None}.
+    Files with more than one page of permissions have the rest fetched in follow-up batches;
+    a file whose later page fails maps to None like one that failed outright.
+    """
+    fields = f"nextPageToken,{fields}"
+    tokens = {}
+
+    def make_request(fid):
+        return svc.permissions().list(fileId=fid, fields=fields, pageSize=100, supportsAllDrives=True,
+                                      pageToken=tokens.get(fid))
+
+    out = {}
+    found = batch_call(svc, ids, make_request, http=http, errors=errors)
+    while found:
+        tokens = {}
+        for fid, resp in found.items():
+            if resp is None:
+                out[fid] = None
+                continue
+            out.setdefault(fid, []).extend(resp.get("permissions", []))
+            if resp.get("nextPageToken"):
+                tokens[fid] = resp["nextPageToken"]
+        found = batch_call(svc, tokens, make_request, http=http, errors=errors) if tokens else {}
+    return out
+
+def batch_call(svc, ids, make_request, http=None, errors=None):
+    """Run make_request(id) for each id in batches of BATCH_LIMIT; returns {id: response or None}."""
+    out = {}
+    failed = {}
+    uniq = list(dict.fromkeys(i for i in ids if i))
+    ctl = controller(http or getattr(svc, "_http", None))
+
+    def cb(request_id, response, exception):
+        out[request_id] = None if exception else response
+        if exception is None:
+            failed.pop(request_id, None)
+        else:
+            failed[request_id] = exception
+
+    for start in range(0, len(uniq), BATCH_LIMIT):
+        todo = uniq[start:start + BATCH_LIMIT]
+        attempt = 0
+        while todo:
+            if len(todo) == 1:
+                # a single call doesn't need the multipart envelope
+                try:
+                    cb(todo[0], execute(make_request(todo[0]), http=http), None)
+                except Exception as e:
+                    cb(todo[0], None, e)
+                break
+            req = svc.new_batch_http_request(callback=cb)
+            for fid in todo:
+                req.add(make_request(fid), request_id=fid)
+            ctl.call(req.execute, http=http, cost=len(todo))
+            retry = [fid for fid in todo if fid in failed and is_retryable(failed[fid])]
+            if not retry or attempt >= MAX_RETRIES:
+                break
+            ctl.backoff(attempt, failed[retry[0]])
+            todo, attempt = retry, attempt + 1
+    if errors is not None:
+        errors.update(failed)
+    return out
+
+def get_meta_many(svc, ids, errors=None, store=None):
+    """
+    Full metadata (as api.get_meta) for many ids, in the order given; failures are None.
+    With a store (store.MetaStore), cached copies are revalidated instead of re-sent:
+    calls carry If-None-Match and a 304 is answered from the local copy. Copies cached
+    without an ETag are checked against the file's `version` (a tiny batched get) first.
+    Fresh results are written back to the store.
+    """
+    if store is None:
+        found = batch_get(svc, ids, META_FIELDS, errors=errors)
+        return [found.get(i) for i in ids]
+    cached = store.get_meta_tagged(ids)
+    same = set()
+    untagged = [fid for fid, (etag, _m) in cached.items() if not etag]
+    if untagged:
+        versions = batch_get(svc, untagged, "id,version")
+        same = {fid for fid in untagged
+                if (versions.get(fid) or {}).get("version") is not None
+                and versions[fid]["version"] == cached[fid][1].get("version")}
+    tags, failed = {}, {}
+
+    def make_request(fid):
+        req = svc.files().get(fileId=fid, fields=META_FIELDS, supportsAllDrives=True)
+        return conditional(req, cached.get(fid, (None, None))[0], tags, fid)
+
+    found = batch_call(svc, [i for i in ids if i not in same], make_request, errors=failed)
+    for fid, e in failed.items():
+        if fid in cached and not_modified(e):
+            same.add(fid)
+        elif errors is not None:
+            errors[fid] = e
+    for fid, meta in found.items():
+        if meta is not None:
+            store.put_meta(meta, etag=tags.get(fid))
+    if same:
+        store.touch_meta(same)
+        found.update((fid, cached[fid][1]) for fid in same)
+    return [found.get(i) for i in ids]
+
+def resolve_shortcuts(svc, items, http=None):
+    """
+    Map each shortcut in items to its target's metadata (id,name,mimeType,size), or None if broken.
+    Costs at most two batch round-trips per BATCH_LIMIT shortcuts (one when listings carry shortcutDetails).
+    """
+    shortcuts = [it for it in items if it.get("mimeType") == SHORTCUT]
+    if not shortcuts:
+        return {}
+    try:
+        missing = [it["id"] for it in shortcuts if not it.get("shortcutDetails")]
+        details = batch_get(svc, missing, "id,shortcutDetails(targetId,targetMimeType)", http=http) if missing else {}
+        target_of = {}
+        for it in shortcuts:
+            det = it.get("shortcutDetails") or (details.get(it["id"]) or {}).get("shortcutDetails") or {}
+            target_of[it["id"]] = det.get("targetId")
+        targets = batch_get(svc, target_of.values(), TARGET_FIELDS, http=http)
+    except Exception:
+        return {it["id"]: None for it in shortcuts}
+    return {sid: (targets.get(tid) if tid else None) for sid, tid in target_of.items()}
@@ -0,0 +1,100 @@
+# googleClient/cache.py
+import os, sys, json, time, threading
+from collections import OrderedDict
+
+DEFAULT_BUDGET = int(os.environ.get("GC_LIST_CACHE_MB", "64")) * 1024 * 1024
+DEFAULT_TTL = 300   # seconds a listing page is reused within a session
+
+def field_names(fields):
+    """Top-level names of a Drive fields projection: 'id,owners(emailAddress)' -> {'id','owners'}."""
+    names, depth, cur = set(), 0, ""
+    for ch in fields or "":
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            names.add(cur.strip()); cur = ""
+        elif depth == 0:
+            cur += ch
+    if cur.strip():
+        names.add(cur.strip())
+    return frozenset(names)
+
+def covers(have, want):
+    """True if rows fetched with projection `have` carry every field of `want`."""
+    return field_names(want) <= field_names(have)
+
+class ListingCache:
+    """
+    Thread-safe LRU of listing pages, bounded by a memory budget in bytes.
+    Pages are kept as compact JSON so the budget reflects real memory, and every
+    hit hands back fresh objects that callers may mutate. Each page remembers the
+    field projection it was fetched with and only serves requests it covers.
+    """
+    def __init__(self, budget=DEFAULT_BUDGET, ttl=DEFAULT_TTL):
+        self.budget = budget
+        self.ttl = ttl
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self._data = OrderedDict()   # key -> (expires_at, nbytes, blob, fields)
+        self._by_folder = {}         # folder id -> set of keys (for invalidation)
+        self._lock = threading.Lock()
+
+    def get(self, key, fields=None):
+        with self._lock:
+            e = self._data.get(key)
+            if e is not None and e[0] < time.monotonic():
+                self._drop(key)
+                e = None
+            if e is None or (fields and e[3] and not covers(e[3], fields)):
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            blob = e[2]
+        return json.loads(blob)
+
+    def put(self, key, value, ttl=None, fields=None):
+        blob = json.dumps(value, separators=(",", ":"))
+        n = sys.getsizeof(blob)
+        if n > self.budget:
+            return
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), n, blob, fields)
+            self._by_folder.setdefault(key[1], set()).add(key)
+            self.bytes += n
+            while self.bytes > self.budget:
+                self._drop(next(iter(self._data)))
+                self.evictions += 1
+
+    def invalidate(self, folder_id):
+        """Drop every cached page of folder_id (all owners, queries and page tokens)."""
+        with self._lock:
+            for key in list(self._by_folder.get(folder_id, ())):
+                self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._by_folder.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._data), "bytes": self.bytes, "budget": self.budget,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    def _drop(self, key):
+        n = self._data.pop(key)[1]
+        self.bytes -= n
+        keys = self._by_folder.get(key[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_folder[key[1]]
+
+# shared by every command through api.list_children
+LIST_CACHE = ListingCache()
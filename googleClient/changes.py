@@ -0,0 +1,66 @@
+# googleClient/changes.py
+import time
+from .api import LIST_FIELDS
+from .cache import LIST_CACHE
+from .throttle import execute
+
+MIN_INTERVAL = 5     # seconds between polls; commands run back-to-back share one poll
+
+_CHANGE_FIELDS = f"nextPageToken,newStartPageToken,changes(fileId,removed,file({LIST_FIELDS},parents,trashed))"
+
+def _start(svc, store):
+    root_id = execute(svc.files().get(fileId="root", fields="id"))["id"]
+    token = execute(svc.changes().getStartPageToken(supportsAllDrives=True))["startPageToken"]
+    store.set_state("root_id", root_id)
+    store.set_state("changes_since", str(time.time()))
+    store.set_state("changes_token", token)
+
+def sync(svc, store, min_interval=MIN_INTERVAL):
+    """
+    Bring cached listings up to date with changes().list deltas since the saved cursor.
+    When nothing changed this is a single cheap call. Errors leave the cache on its TTLs.
+    Returns the number of changes applied.
+    """
+    now = time.time()
+    if store.synced and now - store.polled_at < min_interval:
+        return 0
+    try:
+        token = store.get_state("changes_token")
+        if token is None:
+            # first run: listings cached before tracking began stay on their TTLs
+            _start(svc, store)
+            store.synced, store.polled_at = True, now
+            return 0
+        applied = 0
+        while True:
+            resp = execute(svc.changes().list(
+                pageToken=token,
+                fields=_CHANGE_FIELDS,
+                includeItemsFromAllDrives=True,
+                supportsAllDrives=True,
+                pageSize=1000,
+            ))
+            for ch in resp.get("changes", []):
+                f = ch.get("file")
+                gone = ch.get("removed") or not f or f.get("trashed")
+                touched = store.apply_change(ch["fileId"], None if gone else f)
+                # in-session pages of affected folders are stale too
+                for fid in touched | {ch["fileId"]}:
+                    LIST_CACHE.invalidate(fid)
+                    if fid == "root":
+                        LIST_CACHE.invalidate(store.get_state("root_id"))
+                applied += 1
+            if resp.get("newStartPageToken"):
+                store.set_state("changes_token", resp["newStartPageToken"])
+                break
+            token = resp["nextPageToken"]
+            store.set_state("changes_token", token)
+        store.synced, store.polled_at = True, now
+        return applied
+    except Exception as e:
+        if getattr(getattr(e, "resp", None), "status", None) in (400, 404, 410):
+            # cursor expired/invalid: start over from a clean slate
+            store.reset_listings()
+            store.set_state("changes_token", None)
+        store.synced = False
+        return 0
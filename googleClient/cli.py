@@ -1,9 +1,49 @@
-import argparse, sys
-from .auth import build_service
+import argparse, atexit, os, sys, threading, time
+_T0 = time.perf_counter()   # before the heavier imports below
+from .api import worker_http
+from .auth import build_service, save_token
 from .repl import loop, Ctx
+from .store import MetaStore
+from .throttle import execute
 from . import display
 
+class _Timings:
+    """Startup phase durations for --timings."""
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.last = time.perf_counter()
+        self.rows = [("imports+args", self.last - _T0)]
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.rows.append((name, now - self.last))
+        self.last = now
+
+    def report(self):
+        if not self.enabled:
+            return
+        total = sum(d for _n, d in self.rows)
+        for name, d in self.rows + [("total to prompt", total)]:
+            print(f"  {name:<16} {d * 1000:8.1f} ms")
+
+def _check(ctx, timings):
+    # about() runs while the prompt is already up; the result is shown before the next prompt
+    t0 = time.perf_counter()
+    try:
+        # own transport: the REPL keeps using ctx.svc's, and httplib2 isn't thread-safe
+        about = execute(ctx.svc.about().get(fields="user(emailAddress,displayName)"), http=worker_http(ctx.svc))
+        ctx.notices.append(f"Connected as: {about['user']['emailAddress']} ({about['user']['displayName']})")
+        save_token(ctx.svc._http.credentials)
+    except Exception as e:
+        ctx.notices.append(f"[!] Could not verify access for {ctx.user_email}: {e}")
+    if timings.enabled:
+        ctx.notices.append(f"  about() check   {(time.perf_counter() - t0) * 1000:8.1f} ms (background)")
+
 def main():
+    if sys.argv[1:2] == ["sweep"]:
+        from .sweep import main as sweep_main
+        sys.exit(sweep_main(sys.argv[2:]))
+
     ap = argparse.ArgumentParser(
         description="Google Drive impersonation shell (Domain-wide Delegation)"
     )
@@ -11,16 +51,38 @@ def main():
         help="Path to service_account.json (omit if using SA_JSON_B64/SA_JSON)")
     ap.add_argument("--user", required=True, help="User to impersonate (email)")
     ap.add_argument("--no-color", action="store_true", help="Disable colored output")
+    ap.add_argument("--no-cache", action="store_true",
+        help="Don't read or write the on-disk metadata cache (~/.config/gC/cache)")
+    ap.add_argument("--timings", action="store_true", help="Show how long each startup phase took")
+    ap.add_argument("--pipe", action="store_true",
+        help="Keep stdout for `mget --archive -` data; banner, prompt and messages go to stderr")
     args = ap.parse_args()
+    timings = _Timings(args.timings)
+
+    raw = None
+    if args.pipe:
+        if sys.stdout.isatty():
+            ap.error("--pipe needs stdout redirected to a file or pipe")
+        # keep the real stdout for archive bytes; fd 1 (print, input prompts, readline) becomes stderr
+        sys.stdout.flush()
+        raw = os.fdopen(os.dup(1), "wb")
+        os.dup2(2, 1)
 
     # Initialize colors after args are ready
     display.init_colors(disable_flag=args.no_color)
+    timings.mark("colors")
 
     try:
         svc = build_service(args.key, args.user)
-        about = svc.about().get(fields="user(emailAddress,displayName)").execute()
-        print(f"Connected as: {about['user']['emailAddress']} ({about['user']['displayName']})")
-        loop(Ctx(svc, args.user))
+        timings.mark("credentials+svc")
+        cache = MetaStore(args.user, path=":memory:") if args.no_cache else None
+        ctx = Ctx(svc, args.user, cache=cache)
+        ctx.stdout = raw
+        timings.mark("cache")
+        atexit.register(save_token, svc._http.credentials)
+        threading.Thread(target=_check, args=(ctx, timings), daemon=True).start()
+        timings.report()
+        loop(ctx)
     except Exception as e:
         print(f"[!] Error: {e}", file=sys.stderr)
         sys.exit(1)
@@ -58,26 +58,60 @@ def _config_path() -> str:
 def _isatty() -> bool:
     return hasattr(sys.stdout, "isatty") and sys.stdout.isatty()
 
+# extensions the built-in fallbacks in _resolve look at
+_BUILTIN_EXTS = (".pdf", ".doc", ".docx", ".ppt", ".pptx", ".xls", ".xlsx")
+
 class Colorizer:
     def __init__(self, enabled: bool, styles: Dict[str, str], rules: List[Rule]):
         self.enabled = enabled
         self.styles = styles
         self.rules = rules
+        # rules precompiled into lookups; a rule's position is its precedence
+        self._exact: Dict[str, int] = {}
+        self._ext: Dict[str, int] = {}
+        self._prefix: List[tuple] = []
+        for i, r in enumerate(rules):
+            if r.kind == "mime_exact":
+                self._exact.setdefault(r.value, i)
+            elif r.kind == "ext":
+                self._ext.setdefault(r.value, i)
+            elif r.kind == "mime_prefix":
+                self._prefix.append((r.value, i))
+        self._exts = set(self._ext) | set(_BUILTIN_EXTS)
+        self._styles: Dict[tuple, str] = {}   # (mime, matching extensions) -> style
+        self._codes: Dict[str, tuple] = {}    # style name -> (prefix, suffix)
 
     def colorize(self, text: str, style_name: Optional[str]) -> str:
         if not self.enabled or not style_name:
             return text
-        bold = style_name.startswith("bold_")
-        key = style_name[5:] if bold else style_name
-        code = ANSI.get(key)
-        if not code:
-            return text
-        return (ANSI["bold"] if bold else "") + code + text + ANSI["reset"]
+        codes = self._codes.get(style_name)
+        if codes is None:
+            bold = style_name.startswith("bold_")
+            key = style_name[5:] if bold else style_name
+            code = ANSI.get(key)
+            codes = self._codes[style_name] = (((ANSI["bold"] if bold else "") + code, ANSI["reset"]) if code else ("", ""))
+        return codes[0] + text + codes[1] if codes[0] else text
+
+    def _suffixes(self, name: str) -> tuple:
+        # every configured/built-in extension the (lowercased) name ends with
+        found = []
+        i = name.find(".")
+        while i != -1:
+            if name[i:] in self._exts:
+                found.append(name[i:])
+            i = name.find(".", i + 1)
+        return tuple(found)
 
     def style_for_item(self, item: Dict[str, Any]) -> str:
         mt = (item.get("mimeType") or "").lower()
-        name = (item.get("name") or "")
-
+        key = (mt, self._suffixes((item.get("name") or "").lower()))
+        style = self._styles.get(key)
+        if style is None:
+            style = self._styles[key] = self._resolve(*key)
+        return style
+
+    def _resolve(self, mt: str, exts: tuple) -> str:
+        """Style for a mimeType and the extensions its name ends with (same precedence as before)."""
         if mt == "application/vnd.google-apps.folder":
             return self.styles.get("folder", "bold_cyan")
         if mt == "application/vnd.google-apps.shortcut":
@@ -86,19 +120,18 @@ class Colorizer:
             key = GOOGLE_NATIVE[mt]
             return self.styles.get(key, DEFAULT_STYLES[key])
 
-        for r in self.rules:
-            if r.kind == "mime_exact" and mt == r.value:
-                return r.style
-            if r.kind == "mime_prefix" and mt.startswith(r.value):
-                return r.style
-            if r.kind == "ext" and name.lower().endswith(r.value):
-                return r.style
+        hits = [self._ext[e] for e in exts if e in self._ext]
+        if mt in self._exact:
+            hits.append(self._exact[mt])
+        hits.extend(i for p, i in self._prefix if mt.startswith(p))
+        if hits:
+            return self.rules[min(hits)].style
 
-        if mt == "application/pdf" or name.lower().endswith(".pdf"):
+        if mt == "application/pdf" or ".pdf" in exts:
             return self.styles.get("pdf", "red")
         if mt.startswith("image/"):
             return self.styles.get("image", "yellow")
-        if name.lower().endswith((".doc", ".docx", ".ppt", ".pptx", ".xls", ".xlsx")):
+        if any(e in exts for e in _BUILTIN_EXTS[1:]):
             return self.styles.get("msoffice", "blue")
         if mt.startswith("text/"):
             return self.styles.get("text", "bright_black")
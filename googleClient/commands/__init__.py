@@ -1,5 +1,28 @@
 # googleClient/commands/__init__.py
-REGISTRY = {}
+import pkgutil, importlib
+
+class _Registry(dict):
+    """
+    name -> {"fn", "help"}. A command's module (commands/<name>.py) is imported
+    the first time the command is looked up; load_all() imports the rest (for help).
+    """
+    def __missing__(self, name):
+        if name in _modules() and f"{__name__}.{name}" not in _imported:
+            _import(name)
+            if dict.__contains__(self, name):
+                return dict.__getitem__(self, name)
+        raise KeyError(name)
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+REGISTRY = _Registry()
 
 def command(name, helpline):
     def deco(fn):
@@ -7,11 +30,24 @@ def command(name, helpline):
         return fn
     return deco
 
-# --- auto-import all command modules so decorators run ---
-import pkgutil, importlib
+_imported = set()
+_names = None
+
+def _modules():
+    # names only (a directory listing); nothing is imported here
+    global _names
+    if _names is None:
+        # ignore private modules like __pycache__ or _something.py
+        _names = {n for _f, n, _p in pkgutil.iter_modules(__path__) if not n.startswith("_")}
+    return _names
+
+def _import(name):
+    _imported.add(f"{__name__}.{name}")
+    importlib.import_module(f"{__name__}.{name}")
 
-for _finder, _name, _ispkg in pkgutil.iter_modules(__path__):
-    # ignore private modules like __pycache__ or _something.py
-    if not _name.startswith("_"):
-        importlib.import_module(f"{__name__}.{_name}")
-# --------------------------------------------------------
+def load_all():
+    """Import every command module so REGISTRY is complete."""
+    for name in sorted(_modules()):
+        if f"{__name__}.{name}" not in _imported:
+            _import(name)
+    return REGISTRY
@@ -0,0 +1,184 @@
+import csv, json, os
+from collections import Counter
+from . import command
+from ..batch import batch_permissions, BATCH_LIMIT
+from ..constants import FOLDER
+from ..utils import normalize_compact_flags, has_index
+from ..walk import walk
+
+AUDIT_FIELDS = (
+    "id,name,mimeType,driveId,owners(emailAddress),permissionIds,"
+    "permissions(type,role,emailAddress,domain,allowFileDiscovery)"
+)
+USAGE = "Usage: audit [#] [-L <n>] [--domain <internal.com>]... [--out report.jsonl|report.csv]"
+
+def _parse(args):
+    opts = {"L": None, "domains": set(), "out": None, "idx": None}
+    i = 0
+    while i < len(args):
+        a = args[i]
+        if a in ("-L", "--domain", "--out"):
+            if i + 1 >= len(args):
+                raise ValueError(USAGE)
+            v = args[i + 1]
+            if a == "-L":
+                if not v.isdigit():
+                    raise ValueError("audit: -L requires a positive integer")
+                opts["L"] = max(1, int(v))
+            elif a == "--domain":
+                opts["domains"].add(v.lower().lstrip("@"))
+            else:
+                opts["out"] = v
+            i += 2
+            continue
+        if a.isdigit():
+            opts["idx"] = int(a) - 1
+            i += 1
+            continue
+        raise ValueError(USAGE)
+    return opts
+
+def _domain(p):
+    if p.get("type") == "domain":
+        return (p.get("domain") or "").lower()
+    email = p.get("emailAddress") or ""
+    return email.rsplit("@", 1)[-1].lower() if "@" in email else (p.get("domain") or "").lower()
+
+def _truncated(it):
+    # inline permissions are missing on shared-drive items and for files the user can't share
+    ids = it.get("permissionIds")
+    perms = it.get("permissions")
+    return bool(ids) and (perms is None or len(perms) < len(ids))
+
+class _Report:
+    """Aggregates sharing over audited items and streams flagged ones to a JSONL/CSV file."""
+    def __init__(self, internal, out_path):
+        self.internal = internal
+        self.items = 0
+        self.flagged = 0
+        self.anyone = 0
+        self.public = 0
+        self.domain_wide = 0
+        self.by_domain = Counter()     # external domain -> items shared with it
+        self.by_role = Counter()       # role -> non-owner grants
+        self._fh = self._csv = None
+        if out_path:
+            self._fh = open(out_path, "w", encoding="utf-8", newline="")
+            if out_path.lower().endswith(".csv"):
+                self._csv = csv.writer(self._fh)
+                self._csv.writerow(["path", "id", "mimeType", "owner", "anyone", "external_domains", "shares"])
+
+    def add(self, it, path, perms):
+        self.items += 1
+        anyone, external, shares = None, set(), []
+        for p in perms:
+            role, kind = p.get("role") or "?", p.get("type") or "?"
+            if role == "owner":
+                continue
+            self.by_role[role] += 1
+            if kind == "anyone":
+                anyone = role
+                self.public += bool(p.get("allowFileDiscovery"))
+                shares.append(f"anyone:{role}")
+                continue
+            dom = _domain(p)
+            if dom and dom not in self.internal:
+                external.add(dom)
+            elif kind == "domain":
+                self.domain_wide += 1
+            shares.append(f"{kind}:{p.get('emailAddress') or p.get('domain') or '?'}:{role}")
+        if anyone:
+            self.anyone += 1
+        for dom in external:
+            self.by_domain[dom] += 1
+        if not anyone and not external:
+            return
+        self.flagged += 1
+        owner = ((it.get("owners") or [{}])[0]).get("emailAddress", "")
+        if self._csv:
+            self._csv.writerow([path, it["id"], it.get("mimeType", ""), owner, anyone or "",
+                                ";".join(sorted(external)), ";".join(shares)])
+        elif self._fh:
+            self._fh.write(json.dumps({
+                "path": path, "id": it["id"], "mimeType": it.get("mimeType"), "owner": owner,
+                "anyone": anyone, "external_domains": sorted(external), "shares": shares,
+            }) + "\n")
+
+    def close(self):
+        if self._fh:
+            self._fh.close()
+
+@command("audit", "audit [#] [-L <n>] [--domain <d>]... [--out <file.jsonl|.csv>]  - sharing report for a subtree")
+def handle(ctx, args):
+    """
+    One traversal of the subtree, using the permissions that come inline with each listing.
+    Items whose inline list is missing or partial (shared drives) are fetched with
+    batched permissions().list. The user's own domain (plus any --domain) counts as internal.
+    """
+    args = normalize_compact_flags(args, int_flags=("-L",), assign_flags=("--domain", "--out"))
+    try:
+        opts = _parse(args)
+    except ValueError as e:
+        print(e); return
+    if opts["idx"] is not None:
+        if not ctx.items or not has_index(ctx.items, opts["idx"]):
+            print("(no such item in current view; run ls first)"); return
+        start = ctx.items[opts["idx"]]
+        if start.get("mimeType") != FOLDER:
+            print("That’s not a folder."); return
+    else:
+        start = {"id": ctx.cwd["id"], "name": ctx.breadcrumb[-1], "mimeType": FOLDER}
+    internal = {ctx.user_email.rsplit("@", 1)[-1].lower()} | opts["domains"]
+    try:
+        report = _Report(internal, opts["out"])
+    except OSError as e:
+        print(f"[!] {e}"); return
+
+    pending = []    # (item, path) waiting for a batched permissions().list
+    fallback = 0
+
+    def drain():
+        nonlocal fallback
+        errors = {}
+        found = batch_permissions(ctx.svc, [it["id"] for it, _p in pending], errors=errors)
+        for it, path in pending:
+            perms = found.get(it["id"])
+            if perms is None:
+                perms = it.get("permissions") or []
+                print(f"   [!] permissions unavailable for {path}: {errors.get(it['id'], '?')}")
+            report.add(it, path, perms)
+        fallback += len(pending)
+        pending.clear()
+
+    path_of = {start["id"]: ""}
+    try:
+        for lst in walk(ctx.svc, [start], max_depth=opts["L"], fields=AUDIT_FIELDS):
+            base = path_of.get(lst.folder["id"], "")
+            for it in lst.children:
+                path = f"{base}/{it.get('name') or ''}" if base else (it.get("name") or "")
+                if it.get("mimeType") == FOLDER:
+                    path_of.setdefault(it["id"], path)
+                if _truncated(it):
+                    pending.append((it, path))
+                    if len(pending) >= BATCH_LIMIT:
+                        drain()
+                else:
+                    report.add(it, path, it.get("permissions") or [])
+        if pending:
+            drain()
+    finally:
+        report.close()
+
+    print(f"Audited {report.items} item(s) under {start.get('name', '')}"
+          f"  ({fallback} needed a permissions lookup)")
+    print(f"  Flagged:            {report.flagged}")
+    print(f"  Anyone with link:   {report.anyone}  (discoverable: {report.public})")
+    print(f"  Domain-wide grants: {report.domain_wide}")
+    if report.by_role:
+        print("  Grants by role:     " + ", ".join(f"{r} {n}" for r, n in report.by_role.most_common()))
+    if report.by_domain:
+        print("  External domains:")
+        for dom, n in report.by_domain.most_common():
+            print(f"    {n:>8}  {dom}")
+    if opts["out"]:
+        print(f"[✓] Flagged items written to {os.path.abspath(opts['out'])}")
@@ -0,0 +1,17 @@
+from . import command
+from ..cache import LIST_CACHE
+
+@command("cache", "cache [clear]  - show listing cache statistics, or clear it")
+def handle(ctx, args):
+    if args and args[0] == "clear":
+        LIST_CACHE.clear()
+        ctx.cache.reset_listings()
+        print("(listing cache cleared)"); return
+    if args:
+        print("Usage: cache [clear]"); return
+    st = LIST_CACHE.stats()
+    lookups = st["hits"] + st["misses"]
+    rate = (100.0 * st["hits"] / lookups) if lookups else 0.0
+    print(f"Session pages: {st['entries']}  ({st['bytes'] / 1048576:.1f} / {st['budget'] / 1048576:.0f} MB)")
+    print(f"  Hits: {st['hits']}  Misses: {st['misses']}  ({rate:.0f}% hit)  Evictions: {st['evictions']}")
+    print(f"On-disk cache: {ctx.cache.path}")
@@ -1,5 +1,7 @@
 from . import command
-from ..api import get_meta
+from ..batch import get_meta_many
+from ..utils import has_index
+from ..changes import sync
 
 @command("cd", "cd <#|..|/>  - enter folder by number, go up, or root")
 def handle(ctx, args):
@@ -10,10 +12,13 @@ def handle(ctx, args):
         return
     if args[0] == "..":
         if len(ctx.breadcrumb) > 1:
-            meta = get_meta(ctx.svc, ctx.cwd["id"])
-            parents = meta.get("parents") or []
-            if parents:
-                parent_id = parents[0]
+            sync(ctx.svc, ctx.cache)
+            # parent link is usually known from the listing we came through
+            parent_id = ctx.cache.parent_of(ctx.cwd["id"])
+            if parent_id is None:
+                meta = get_meta_many(ctx.svc, [ctx.cwd["id"]], store=ctx.cache)[0] or {}
+                parent_id = (meta.get("parents") or [None])[0]
+            if parent_id:
                 ctx.cwd = {"id": parent_id, "name": "(parent)"}
                 ctx.breadcrumb.pop()
             else:
@@ -24,7 +29,7 @@ def handle(ctx, args):
     idx = int(args[0]) - 1
     if not ctx.items:
         print("(no items in current view; run ls to fill the view first)"); return
-    if not (0 <= idx < len(ctx.items)):
+    if not has_index(ctx.items, idx):
         print(f"Index out of range (1-{len(ctx.items)})"); return
     target = ctx.items[idx]
     if target.get("mimeType") != "application/vnd.google-apps.folder":
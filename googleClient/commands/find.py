@@ -0,0 +1,102 @@
+import re, time, fnmatch
+from . import command
+from ..api import iter_files
+from ..changes import sync
+from ..display import print_table
+
+USAGE = 'Usage: find <"substring"|glob> | -e <regex>  [--all] [--scan]'
+SCAN_FIELDS = "id,name,mimeType,modifiedTime,size,parents,shortcutDetails(targetId,targetMimeType)"
+
+def _literal(glob):
+    # longest wildcard-free run of a glob, to narrow candidates through the trigram index
+    runs = re.split(r"[*?\[\]]+", glob)
+    best = max(runs, key=len) if runs else ""
+    return best if len(best) >= 3 else None
+
+def _parse(args):
+    opts = {"all": False, "scan": False, "regex": None, "term": None}
+    rest = []
+    i = 0
+    while i < len(args):
+        a = args[i]
+        if a == "--all": opts["all"] = True
+        elif a == "--scan": opts["scan"] = True
+        elif a in ("-e", "--regex"):
+            if i + 1 >= len(args):
+                raise ValueError(f"{a} requires a pattern")
+            opts["regex"] = args[i + 1]; i += 1
+        else:
+            rest.append(a)
+        i += 1
+    term = " ".join(rest).strip()
+    if len(term) >= 2 and term[0] == term[-1] == '"':
+        term = term[1:-1]
+    opts["term"] = term or None
+    if not opts["term"] and not opts["regex"]:
+        raise ValueError(USAGE)
+    return opts
+
+@command("find", 'find <"substring"|glob> | -e <regex> [--all] [--scan]  - search the local name index recursively')
+def handle(ctx, args):
+    """
+    Recursive name search over everything already listed (ls, tree, size, mget -r),
+    under the current folder, or everywhere with --all. --scan first indexes every
+    visible file with one flat scan. Results become the current view for get/mget.
+    """
+    try:
+        opts = _parse(args)
+    except ValueError as e:
+        print(e); return
+    store = ctx.cache
+    # applies pending changes to the index, and learns the My Drive root id a scan needs
+    sync(ctx.svc, store)
+    if opts["scan"]:
+        n = 0
+        batch = []
+        for f in iter_files(ctx.svc, SCAN_FIELDS):
+            batch.append(f)
+            if len(batch) >= 1000:
+                store.index_files(batch); n += len(batch); batch = []
+        store.index_files(batch); n += len(batch)
+        print(f"[✓] Indexed {n} item(s).")
+
+    t0 = time.perf_counter()
+    if opts["regex"]:
+        try:
+            rx = re.compile(opts["regex"], re.IGNORECASE)
+        except re.error as e:
+            print(f"[!] Bad regex: {e}"); return
+        hits = store.find_names(match=lambda name: rx.search(name) is not None)
+    elif any(ch in opts["term"] for ch in "*?[]"):
+        rx = re.compile(fnmatch.translate(opts["term"]), re.IGNORECASE)
+        hits = store.find_names(substring=_literal(opts["term"]), match=lambda name: rx.match(name) is not None)
+    else:
+        term = opts["term"].lower()
+        hits = store.find_names(substring=opts["term"], match=lambda name: term in name.lower())
+
+    chains = store.ancestry({p for _r, p in hits})
+    scope = ctx.cwd["id"]
+    results = []
+    seen = set()
+    for row, parent in hits:
+        chain = chains.get(parent) or []
+        ids = [cid for cid, _n in chain]
+        if not opts["all"]:
+            if scope not in ids:
+                continue
+            chain = chain[:ids.index(scope)]
+        if row["id"] in seen:
+            continue
+        seen.add(row["id"])
+        names = [n or "…" for _c, n in reversed(chain)]
+        results.append((("/".join(names + [row.get("name") or ""])), row))
+    results.sort(key=lambda t: t[0].lower())
+    ms = (time.perf_counter() - t0) * 1000
+
+    if not results:
+        print("(no matches in the local index; ls/tree/size -L folders first, or run find --scan)"); return
+    paths = {id(r): p for p, r in results}
+    rows = [r for _p, r in results]
+    print_table(rows, label=lambda it: paths[id(it)])
+    print(f"({len(rows)} match(es) in {ms:.1f} ms from the local index)")
+    ctx.items = rows
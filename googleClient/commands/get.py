@@ -1,12 +1,17 @@
 from . import command
-from ..api import download_file
-from ..utils import parse_selection, select_by_glob
+from ..transfer import DownloadPool
+from ..utils import parse_selection, select_by_glob, selection_bound, normalize_compact_flags, pop_jobs_flag
 from ..api import get_meta
 
-@command("get", "get <#|#-#|#,#,...|glob>  - download by index/range/list or glob")
+@command("get", "get <#|#-#|#,#,...|glob> [-j <n>]  - download by index/range/list or glob")
 def handle(ctx, args):
+    args = normalize_compact_flags(args, int_flags=("-j",), assign_flags=("--jobs",))
+    try:
+        jobs, args = pop_jobs_flag(args)
+    except ValueError as e:
+        print(e); return
     if not args:
-        print("Usage: get <#|#-#|#,#,...|glob>"); return
+        print("Usage: get <#|#-#|#,#,...|glob> [-j <n>]"); return
     if not ctx.items:
         print("(no items in current view; run ls to fill the view first)"); return
     sel = " ".join(args)
@@ -15,16 +20,12 @@ def handle(ctx, args):
         if not idx_list:
             print(f"(no matches for pattern '{sel}')"); return
     else:
-        idx_list = parse_selection(sel, len(ctx.items))
-    ok = skipped = failed = 0
-    for idx in idx_list:
-        target = ctx.items[idx]
-        if target.get("mimeType") == "application/vnd.google-apps.folder":
-            print(f"↷ Skipping folder: {target['name']}"); skipped += 1; continue
-        try:
-            print(f"↓ {target['name']}")
-            path = download_file(ctx.svc, target)
-            ok += 1
-        except Exception as e:
-            print(f"   [!] Failed: {e}"); failed += 1
-    print(f"[✓] Completed: {ok} file(s).  Skipped folders: {skipped}.  Failed: {failed}.")
+        idx_list = parse_selection(sel, selection_bound(sel, ctx.items))
+    skipped = 0
+    with DownloadPool(ctx.svc, jobs) as pool:
+        for idx in idx_list:
+            target = ctx.items[idx]
+            if target.get("mimeType") == "application/vnd.google-apps.folder":
+                print(f"↷ Skipping folder: {target['name']}"); skipped += 1; continue
+            pool.submit(target, ".", target["name"])
+    print(f"[✓] Completed: {pool.ok} file(s).  Skipped folders: {skipped}.  Failed: {pool.failed}.")
@@ -1,34 +1,40 @@
 # googleClient/commands/info.py
 import json
 from . import command
-from ..api import get_meta
+from ..batch import get_meta_many
+from ..utils import select_indices
 
-@command("info", "info <#>  - show detailed metadata for a file/folder by index")
+@command("info", "info <#|#-#|#,#,...|*|glob>  - show detailed metadata for files/folders by index")
 def handle(ctx, args):
-    # Require an index and a current listing
+    # Require a selection and a current listing
     if not args:
-        print("Usage: info <#>"); return
+        print("Usage: info <#|#-#|#,#,...|*|glob>"); return
     if not ctx.items:
         print("(no items in current view; run ls to fill the view first)"); return
 
-    # Parse 1-based index safely and bounds-check
+    # Parse 1-based indices/ranges/globs safely and bounds-check
     try:
-        idx_1based = int(args[0].strip())
-    except Exception:
-        print("Invalid index"); return
+        idx_list = select_indices(" ".join(args), ctx.items)
+    except ValueError as e:
+        print(e); return
+    if not idx_list:
+        print("(no matching items)"); return
 
-    if not (1 <= idx_1based <= len(ctx.items)):
-        print(f"Invalid index (valid: 1–{len(ctx.items)})"); return
+    # Ask Drive for full metadata (batched: one round-trip per 100 items; unchanged items come from the cache)
+    targets = [ctx.items[i] for i in idx_list]
+    errors = {}
+    metas = get_meta_many(ctx.svc, [t["id"] for t in targets], errors=errors, store=ctx.cache)
 
-    target = ctx.items[idx_1based - 1]
+    for i, target, meta in zip(idx_list, targets, metas):
+        if len(targets) > 1:
+            print(f"== {i + 1}. {target.get('name','')}")
+        if meta is None:
+            print(f"[!] {errors.get(target['id'], 'metadata unavailable')}"); continue
 
-    # Ask Drive for full metadata
-    meta = get_meta(ctx.svc, target["id"])
+        # Optional: surface shortcut target at a glance
+        sd = meta.get("shortcutDetails")
+        if sd and sd.get("targetId"):
+            print(f"(shortcut → {sd['targetId']} : {sd.get('targetMimeType','?')})")
 
-    # Optional: surface shortcut target at a glance
-    sd = meta.get("shortcutDetails")
-    if sd and sd.get("targetId"):
-        print(f"(shortcut → {sd['targetId']} : {sd.get('targetMimeType','?')})")
-
-    # Pretty-print stable, readable JSON
-    print(json.dumps(meta, indent=2, sort_keys=True))
+        # Pretty-print stable, readable JSON
+        print(json.dumps(meta, indent=2, sort_keys=True))
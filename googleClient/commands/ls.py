@@ -1,34 +1,46 @@
 from . import command
-from ..api import list_children
+from ..changes import sync
 from ..display import print_table
+from ..paged import PagedListing
+from ..utils import has_index
+
+def _show(ctx, folder_id):
+    """
+    Print a folder's listing and return it as a view for ctx.items.
+    Cached listings print at once; otherwise each page prints as it arrives.
+    Ctrl-C stops printing; the remaining pages load on demand when selected.
+    """
+    rows = ctx.cache.get_listing(folder_id)
+    if rows is not None:
+        print_table(rows)
+        return rows
+    view = PagedListing(ctx.svc, folder_id, on_complete=lambda rows: ctx.cache.put_listing(folder_id, rows))
+    shown = 0
+    try:
+        for page in view.pages():
+            print_table(page, start=shown + 1)
+            shown += len(page)
+    except KeyboardInterrupt:
+        print(f"\n(stopped after {shown} rows; later rows load when selected)")
+        return view
+    if not shown:
+        print_table([])
+    return view
 
 @command("ls", "ls [#]  - list current folder or list folder by index")
 def handle(ctx, args):
+    sync(ctx.svc, ctx.cache)
     if not args:
-        rows = ctx.cache.get(ctx.cwd["id"])
-        if rows is None:
-            rows, token = [], None
-            while True:
-                batch, token = list_children(ctx.svc, ctx.cwd["id"], page_token=token)
-                rows += batch
-                if not token: break
-            ctx.cache[ctx.cwd["id"]] = rows
-        print_table(rows)
-        ctx.items = rows
+        ctx.items = _show(ctx, ctx.cwd["id"])
         return
     # ls # (peek subfolder without changing cwd)
     idx = int(args[0]) - 1
     if not ctx.items:
         print("(no items in current view; run ls to fill the view first)"); return
-    if not (0 <= idx < len(ctx.items)):
+    if not has_index(ctx.items, idx):
         print(f"Index out of range (1-{len(ctx.items)})"); return
     target = ctx.items[idx]
     if target.get("mimeType") != "application/vnd.google-apps.folder":
         print("That’s not a folder."); return
-    rows, token = [], None
-    while True:
-        batch, token = list_children(ctx.svc, target["id"], page_token=token)
-        rows += batch
-        if not token: break
     print(f"[Listing: {target['name']}]")
-    print_table(rows)
+    _show(ctx, target["id"])
@@ -1,21 +1,25 @@
 from . import command
-from ..api import list_children, download_file
-from ..utils import sanitize, normalize_compact_flags, parse_selection, select_by_glob
-from collections import deque
-import os
+from ..api import iter_media, output_path
+from ..archive import ArchiveWriter, MemberError
+from ..constants import EXPORT_MAP
+from ..journal import DownloadJournal, JOURNAL_NAME
+from ..plan import build_plan
+from ..transfer import DownloadPool, ObjectStore
+from ..utils import normalize_compact_flags, parse_selection, select_by_glob, selection_bound, has_index, human_size
+import os, shutil, hashlib
 
 @command(
     "mget",
-    "mget <*|#|#-#|#,#,...|glob>... [-r] [-L <n>] [--follow-shortcuts] [--into <dir>]  - download selected items; optionally recurse into folders"
+    "mget <*|#|#-#|#,#,...|glob>... [-r] [-L <n>] [--follow-shortcuts] [--into <dir>] [-j <n>] [--force] [--dedupe] [--dry-run] [--archive <file|->]  - download selected items; optionally recurse into folders"
 )
 def handle(ctx, args):
     if not ctx.items:
         print("(no items in current view; run ls to fill the view first)"); return
     if not args:
-        print("Usage: mget <*|#|#-#|#,#,...|glob>... [-r] [-L <n>] [--follow-shortcuts] [--into <dir>]"); return
+        print("Usage: mget <*|#|#-#|#,#,...|glob>... [-r] [-L <n>] [--follow-shortcuts] [--into <dir>] [-j <n>] [--force] [--dedupe] [--dry-run] [--archive <file|->]"); return
 
     # normalize compact flags (-L1 -> -L 1, --into=/x -> --into /x)
-    args = normalize_compact_flags(args, int_flags=("-L",), assign_flags=("--into",))
+    args = normalize_compact_flags(args, int_flags=("-L", "-j"), assign_flags=("--into", "--jobs", "--archive"))
 
     # parse (flags can appear anywhere)
     selectors = []
@@ -23,6 +27,11 @@ def handle(ctx, args):
     max_depth = None
     follow_shortcuts = False
     out_root = os.getcwd()
+    jobs = 1
+    force = False
+    dedupe = False
+    dry_run = False
+    archive = None
 
     i = 0
     while i < len(args):
@@ -38,8 +47,27 @@ def handle(ctx, args):
             except Exception:
                 print("(-L) requires a non-negative integer"); return
             i += 2; continue
+        if tok in ("-j", "--jobs"):
+            if i + 1 >= len(args) or not args[i+1].isdigit() or int(args[i+1]) < 1:
+                print(f"({tok}) requires a positive integer"); return
+            jobs = int(args[i+1]); i += 2; continue
         if tok == "--follow-shortcuts":
             follow_shortcuts = True; i += 1; continue
+        if tok == "--force":
+            force = True; i += 1; continue
+        if tok == "--dedupe":
+            dedupe = True; i += 1; continue
+        if tok == "--dry-run":
+            dry_run = True; i += 1; continue
+        if tok == "--archive":
+            if i + 1 >= len(args):
+                print("--archive requires a file name (or - for stdout)"); return
+            archive = args[i+1]; i += 2
+            if archive == "-" and ctx.stdout is None:
+                # stdout carries the shell's own output here (or sweep's output.log)
+                print("--archive - needs stdout to itself: start gC with --pipe, "
+                      "e.g. gC --user <email> --pipe | ssh host 'cat > evidence.tar'"); return
+            continue
         if tok == "--into":
             if i + 1 >= len(args):
                 print("--into requires a directory path"); return
@@ -49,29 +77,7 @@ def handle(ctx, args):
         selectors.append(tok); i += 1
 
     if not selectors:
-        print("Usage: mget <*|#|#-#|#,#,...|glob>... [-r] [-L <n>] [--follow-shortcuts] [--into <dir>]"); return
-
-    os.makedirs(out_root, exist_ok=True)
-
-    def is_folder(it):   return it.get("mimeType") == "application/vnd.google-apps.folder"
-    def is_shortcut(it): return it.get("mimeType") == "application/vnd.google-apps.shortcut"
-
-    # resolve shortcut targets (on demand)
-    def resolve_shortcut_target(item):
-        if not follow_shortcuts: return None
-        try:
-            meta = ctx.svc.files().get(
-                fileId=item["id"],
-                fields="shortcutDetails(targetId,targetMimeType)",
-                supportsAllDrives=True,
-            ).execute()
-            det = meta.get("shortcutDetails") or {}
-            tid, tmime = det.get("targetId"), det.get("targetMimeType")
-            if not tid: return None
-            return {"id": tid, "name": item.get("name","(unnamed)"), "mimeType": tmime}
-        except Exception as e:
-            print(f"   [!] failed to resolve shortcut for {item.get('name','(unnamed)')}: {e}")
-            return None
+        print("Usage: mget <*|#|#-#|#,#,...|glob>... [-r] [-L <n>] [--follow-shortcuts] [--into <dir>] [-j <n>] [--force] [--dedupe] [--dry-run] [--archive <file|->]"); return
 
     # expand selectors against ctx.items
     selected = []
@@ -81,14 +87,14 @@ def handle(ctx, args):
             selected.extend(ctx.items); continue
         try:
             if any(ch in s for ch in (",","-")) and all(c.isdigit() or c in ",-" for c in s):
-                for idx0 in parse_selection(s, len(ctx.items)):  # 0-based
+                for idx0 in parse_selection(s, selection_bound(s, ctx.items)):  # 0-based
                     selected.append(ctx.items[idx0])
                 continue
         except Exception:
             pass
         if s.isdigit():
             n = int(s)
-            if 1 <= n <= len(ctx.items): selected.append(ctx.items[n-1])
+            if has_index(ctx.items, n-1): selected.append(ctx.items[n-1])
             else: print(f"Index out of range (1–{len(ctx.items)}): {n}")
             continue
         for i0 in select_by_glob(s, ctx.items):
@@ -97,51 +103,121 @@ def handle(ctx, args):
     if not selected:
         print("(no matching items)"); return
 
-    # BFS queue entries: (id, name, rel, depth, mime)
-    q = deque()
-    for it in selected:
-        if is_shortcut(it) and follow_shortcuts:
-            tgt = resolve_shortcut_target(it)
-            if tgt: it = tgt
-        q.append((it.get("id"), it.get("name") or "unnamed", "", 0, it.get("mimeType")))
-
-    downloaded = skipped = 0
+    # plan everything first: ids, paths, sizes; loops and repeats are found before any download
+    plan = build_plan(ctx.svc, selected, recursive=recursive, max_depth=max_depth, follow_shortcuts=follow_shortcuts)
+    for name in plan.broken:
+        print(f"   [!] failed to resolve shortcut for {name}")
+    for path, target in plan.cycles:
+        print(f"   [!] shortcut loop: {path} leads back to {target} (not followed)")
+    if dry_run:
+        for e in plan.entries:
+            ext = EXPORT_MAP.get(e.item.get("mimeType"))
+            size = f"export {ext[1]}" if ext else human_size(int(e.item.get("size") or 0))
+            print(f"{size:>12}  {e.label}")
+
+    exports = f" (+{plan.exports} Google file(s) exported, size unknown)" if plan.exports else ""
+    print(f"Plan: {len(plan.entries)} file(s), {human_size(plan.bytes)}{exports}.  "
+          f"Skipped folders: {plan.skipped_folders}.  Reached twice (planned once): {plan.duplicates}.")
+    if plan.renamed:
+        print(f"    Same name as another file in its folder (id appended): {plan.renamed}.")
+    if plan.repeats:
+        hint = "" if dedupe or archive else " (--dedupe fetches their content once)"
+        print(f"    Same file at more than one path: {plan.repeats}{hint}.")
+    if dry_run:
+        if not force and os.path.exists(os.path.join(out_root, JOURNAL_NAME)):
+            journal = DownloadJournal(out_root)
+            print(f"To download into {out_root}: {human_size(plan.needed(out_root, journal, dedupe))}")
+            journal.close()
+        return
+    if not plan.entries:
+        return
+    if archive:
+        if jobs > 1 or dedupe:
+            print("(--archive streams one file at a time; -j and --dedupe don't apply)")
+        if archive != "-" and (not os.path.exists(archive) or os.path.isfile(archive)):   # pipes take no disk space
+            free = shutil.disk_usage(os.path.dirname(os.path.abspath(archive))).free
+            if plan.bytes > free:
+                print(f"[!] Not enough space for {archive}: up to {human_size(plan.bytes)}, {human_size(free)} free.")
+                return
+        _write_archive(ctx, plan, archive)
+        return
 
-    while q:
-        file_id, name, rel, depth, mime = q.popleft()
-        safe_name = sanitize(name)
-        outdir = os.path.join(out_root, rel)
-        os.makedirs(outdir, exist_ok=True)  # ensure directories exist
-
-        if mime == "application/vnd.google-apps.folder":
-            if not recursive:
-                skipped += 1
+    os.makedirs(out_root, exist_ok=True)
+    # the journal under --into lets a rerun skip unchanged files and resume partial ones;
+    # --force re-fetches everything (and records it afresh)
+    journal = DownloadJournal(out_root, force=force)
+    needed = plan.needed(out_root, journal, dedupe)
+    free = shutil.disk_usage(out_root).free
+    if needed > free:
+        journal.close()
+        print(f"[!] Not enough space in {out_root}: {human_size(needed)} to download, {human_size(free)} free.")
+        return
+    # --dedupe: one download per distinct content (md5+size, or id), hardlinked into place
+    objects = ObjectStore(out_root) if dedupe else None
+    with DownloadPool(ctx.svc, jobs, journal=journal, objects=objects) as pool:
+        for e in plan.entries:
+            pool.submit(e.item, os.path.join(out_root, e.outdir), e.label)
+    journal.close()
+
+    print(f"[✓] Downloaded {pool.ok} file(s).  Failed: {pool.failed}.")
+    if pool.unchanged or pool.resumed:
+        print(f"    Unchanged (skipped): {pool.unchanged}.  Resumed: {pool.resumed}.")
+    if pool.linked:
+        print(f"    Deduplicated: {pool.linked} file(s) linked to content already downloaded "
+              f"({objects.saved / 1048576:.1f} MiB not transferred).")
+    if pool.redownloaded:
+        print(f"    Re-downloaded after checksum mismatch: {pool.redownloaded}.")
+
+def _hashed(first, rest, md5):
+    md5.update(first)
+    yield first
+    for c in rest:
+        md5.update(c)
+        yield c
+
+def _write_archive(ctx, plan, target):
+    """Stream every planned file into one archive, one file after another; nothing is staged on disk."""
+    try:
+        writer = ArchiveWriter(target, raw=ctx.stdout if target == "-" else None)
+    except (OSError, ValueError) as e:
+        print(f"[!] {e}"); return
+    ok = failed = mismatched = 0
+    label = ""
+    try:
+        for e in plan.entries:
+            item, label = e.item, e.label
+            exported = item.get("mimeType") in EXPORT_MAP
+            meta = {}
+            chunks = iter_media(ctx.svc, item, meta=meta)
+            # the first chunk arrives before the member is started, so a file that
+            # can't be fetched at all is skipped without damaging the archive
+            try:
+                first = next(chunks, b"")
+            except Exception as err:
+                failed += 1
+                print(f"   [!] failed {label}: {err}")
                 continue
-            if max_depth is not None and depth >= max_depth:
+            md5 = hashlib.md5()
+            # the header takes the size Drive reports now; the file may have changed since planning
+            size = None if exported else meta.get("size", int(item.get("size") or 0))
+            try:
+                writer.add(output_path(item, e.outdir).replace(os.sep, "/"), _hashed(first, chunks, md5),
+                           size=size, modified=item.get("modifiedTime"))
+            except MemberError as err:
+                failed += 1
+                print(f"   [!] failed {err}")   # names the member
                 continue
-            token = None
-            while True:
-                batch, token = list_children(ctx.svc, file_id, page_token=token)
-                for child in batch:
-                    cmime = child.get("mimeType")
-                    cname = child.get("name") or "unnamed"
-                    if is_shortcut(child) and follow_shortcuts:
-                        tgt = resolve_shortcut_target(child)
-                        if tgt:
-                            child = tgt
-                            cmime = child.get("mimeType")
-                            cname = child.get("name") or "unnamed"
-                    child_rel = os.path.join(rel, safe_name)
-                    q.append((child.get("id"), cname, child_rel, depth+1, cmime))
-                if not token: break
-            continue
-
-        # file (or exportable Google doc)
-        try:
-            download_file(ctx.svc, {"id": file_id, "name": name, "mimeType": mime}, outdir=outdir)
-            downloaded += 1
-            print(f"↓ {os.path.join(rel, safe_name)}")
-        except Exception as e:
-            print(f"   [!] failed {name}: {e}")
-
-    print(f"[✓] Downloaded {downloaded} file(s).  Skipped folders: {skipped}.")
+            want = None if exported else item.get("md5Checksum")
+            if want and md5.hexdigest() != want:
+                mismatched += 1
+                print(f"   [!] checksum mismatch for {label} (already in the archive)")
+            else:
+                ok += 1
+                print(f"↓ {label}")
+    except Exception as err:
+        print(f"[!] archive aborted at {label}: {err}")
+    finally:
+        writer.close()
+    dest = "stdout" if target == "-" else os.path.abspath(target)
+    print(f"[✓] Archived {ok} file(s) to {dest}.  Failed: {failed}."
+          + (f"  Checksum mismatches: {mismatched}." if mismatched else ""))
@@ -1,17 +1,29 @@
 from . import command
-from ..api import get_meta
+from ..batch import get_meta_many
+from ..utils import select_indices
 
-@command("perms", "perms <#>  - show permissions for item")
+@command("perms", "perms <#|#-#|#,#,...|*|glob>  - show permissions for items")
 def handle(ctx, args):
-    if not args: print("Usage: perms <#>"); return
-    idx = int(args[0]) - 1
+    if not args: print("Usage: perms <#|#-#|#,#,...|*|glob>"); return
     if not ctx.items:
         print("(no items in current view; run ls to fill the view first)"); return
-    target = ctx.items[idx]
-    meta = get_meta(ctx.svc, target["id"])
-    perms = meta.get("permissions") or []
-    if not perms:
-        print(" - (no explicit permissions listed)"); return
-    for p in perms:
-        who = p.get("emailAddress") or p.get("domain") or p.get("displayName") or "(link)"
-        print(f" - {p.get('role','?'):10s} {who}")
+    try:
+        idx_list = select_indices(" ".join(args), ctx.items)
+    except ValueError as e:
+        print(e); return
+    if not idx_list:
+        print("(no matching items)"); return
+    targets = [ctx.items[i] for i in idx_list]
+    errors = {}
+    metas = get_meta_many(ctx.svc, [t["id"] for t in targets], errors=errors, store=ctx.cache)
+    for i, target, meta in zip(idx_list, targets, metas):
+        if len(targets) > 1:
+            print(f"{i + 1}. {target.get('name','')}")
+        if meta is None:
+            print(f" - [!] {errors.get(target['id'], 'metadata unavailable')}"); continue
+        perms = meta.get("permissions") or []
+        if not perms:
+            print(" - (no explicit permissions listed)"); continue
+        for p in perms:
+            who = p.get("emailAddress") or p.get("domain") or p.get("displayName") or "(link)"
+            print(f" - {p.get('role','?'):10s} {who}")
@@ -1,19 +1,98 @@
 from . import command
-from ..api import list_children
+from ..api import list_children, iter_files, LIST_FIELDS
+from ..batch import batch_get
+from ..changes import sync
 from ..display import print_table
+from ..item import compact, compact_all
 
-@command("search", "search \"<namepart>\"  - search under current folder by name")
+PARENT_FIELDS = "id,name,mimeType,modifiedTime,parents"
+
+def _resolve(svc, store, ids, memo, stop):
+    """
+    Fill memo[id] = (name, [parent ids]) for ids and their ancestors, up to the ids in stop.
+    The local name index answers first; the rest are fetched in batches, level by level.
+    """
+    todo = {i for i in ids if i not in memo and i not in stop}
+    while todo:
+        memo.update(store.names_of(todo))
+        missing = [i for i in todo if i not in memo]
+        if missing:
+            found = batch_get(svc, missing, PARENT_FIELDS)
+            for fid in missing:
+                meta = found.get(fid)
+                memo[fid] = (meta.get("name"), meta.get("parents") or []) if meta else (None, [])
+            store.index_files([m for m in found.values() if m])
+        todo = {p for i in todo for p in memo[i][1] if p not in memo and p not in stop}
+
+def _recursive(ctx, term):
+    """
+    One corpora-wide name query, kept to hits whose parent chain reaches ctx.cwd.
+    Returns [(path below cwd, row)].
+    """
+    store = ctx.cache
+    sync(ctx.svc, store)   # also records the My Drive root id
+    scope = ctx.cwd["id"]
+    tops = {scope}
+    if scope == "root" or scope == store.get_state("root_id"):
+        tops |= {"root", store.get_state("root_id")}
+    safe = term.replace("\\", "\\\\").replace("'", "\\'")
+    hits = list(iter_files(ctx.svc, f"{LIST_FIELDS},parents",
+                           q=f"name contains '{safe}' and trashed=false", page_size=1000))
+
+    memo = {}
+    _resolve(ctx.svc, store, {p for h in hits for p in (h.get("parents") or ())}, memo, tops)
+    route = {}   # folder id -> path segments below scope, or None if outside it
+
+    def below(fid, seen=()):
+        if fid in tops:
+            return []
+        if fid in route:
+            return route[fid]
+        if fid in seen or fid not in memo:
+            return None
+        name, parents = memo[fid]
+        route[fid] = None
+        for p in parents:
+            up = below(p, seen + (fid,))
+            if up is not None:
+                route[fid] = up + [name or "…"]
+                break
+        return route[fid]
+
+    out = []
+    for h in hits:
+        for p in h.get("parents") or ():
+            segs = below(p)
+            if segs is not None:
+                row = compact({k: v for k, v in h.items() if k != "parents"})
+                out.append(("/".join(segs + [h.get("name") or ""]), row))
+                break
+    out.sort(key=lambda t: t[0].lower())
+    return out
+
+@command("search", "search [-r] \"<namepart>\"  - search current folder by name; -r searches the whole subtree")
 def handle(ctx, args):
+    recursive = "-r" in args
+    args = [a for a in args if a != "-r"]
     q = " ".join(args).strip()
     if not (q.startswith('"') and q.endswith('"') and len(q) >= 2):
-        print('Usage: search "namepart"'); return
+        print('Usage: search [-r] "namepart"'); return
     term = q[1:-1]
+    if recursive:
+        found = _recursive(ctx, term)
+        if not found:
+            print("(no matches)"); return
+        paths = {id(r): p for p, r in found}
+        results = [r for _p, r in found]
+        print_table(results, label=lambda it: paths[id(it)])
+        ctx.items = results
+        return
     safe = term.replace("'", "\\'")
     extra = f"name contains '{safe}'"
     results, token = [], None
     while True:
         batch, token = list_children(ctx.svc, ctx.cwd["id"], page_token=token, query_extra=extra)
-        results.extend(batch)
+        results.extend(compact_all(batch))
         if not token: break
     if not results:
         print("(no matches)"); return
@@ -1,20 +1,24 @@
+from collections import deque
 from . import command
-from ..api import list_children
-from ..api import get_meta
-from ..utils import normalize_compact_flags
+from ..api import iter_files
+from ..throttle import execute
+from ..utils import normalize_compact_flags, has_index
+from ..walk import walk
+from ..changes import sync
 
 def _parse_args(args):
     """
-    size [-L#] [-B|-K|-M|-G] [--follow-shortcuts] [N]
+    size [-L#] [-B|-K|-M|-G] [--follow-shortcuts] [--fast] [N]
       -L N or -L#       recursion depth (default: full depth)
       -B                force bytes
       -K                force kilobytes
       -M                force megabytes
       -G                force gigabytes
       --follow-shortcuts follow Drive shortcuts when encountered
+      --fast            one flat scan of all visible files instead of a folder walk
       N                 start at item index N from current listing (1-based)
     """
-    opts = {"L": None, "unit": None, "follow_shortcuts": False}
+    opts = {"L": None, "unit": None, "follow_shortcuts": False, "fast": False}
     target_idx = None
     i = 0
     while i < len(args):
@@ -47,6 +51,11 @@ def _parse_args(args):
             i += 1
             continue
 
+        if a == "--fast":
+            opts["fast"] = True
+            i += 1
+            continue
+
         # numeric index (#N or N)
         if a.startswith("#") or a.isdigit():
             n = int(a[1:]) if a.startswith("#") else int(a)
@@ -66,45 +75,25 @@ def _is_folder(item):
 def _is_shortcut(item):
     return item.get("mimeType") == "application/vnd.google-apps.shortcut"
 
-def _resolve_shortcut_target(svc, shortcut_item):
-    try:
-        meta = svc.files().get(
-            fileId=shortcut_item["id"],
-            fields="id,name,mimeType,shortcutDetails(targetId,targetMimeType)",
-            supportsAllDrives=True,
-        ).execute()
-        det = meta.get("shortcutDetails") or {}
-        tid = det.get("targetId")
-        if not tid:
-            return None
-        targ = svc.files().get(
-            fileId=tid,
-            fields="id,name,mimeType,size",
-            supportsAllDrives=True,
-        ).execute()
-        return targ
-    except Exception:
-        return None
-
-def _walk_sum(svc, folder_id, depth_left, follow_shortcuts, visited=None):
+def _walk_sum(svc, folder, depth_limit, follow_shortcuts, visited=None, store=None):
     """
     Return (total_bytes, file_count, folder_count, skipped_native_count)
+    Folders are listed concurrently by walk(); sums don't depend on arrival order.
     """
     total = 0
     files = 0
     folders = 0
     skipped_native = 0
 
-    token = None
-    while True:
-        batch, token = list_children(svc, folder_id, page_token=token)
-        # sort not required for sum, but keeps traversal stable if you log later
-        batch.sort(key=lambda it: (not _is_folder(it), (it.get("name") or "").lower()))
-        for it in batch:
+    # the start folder is always listed, even with -L0
+    max_depth = None if depth_limit is None else max(1, depth_limit)
+    for lst in walk(svc, [folder], max_depth=max_depth, follow_shortcuts=follow_shortcuts, store=store):
+        descends = max_depth is None or lst.depth + 1 < max_depth
+        for it in lst.children:
             if _is_shortcut(it):
                 if not follow_shortcuts:
                     continue
-                target = _resolve_shortcut_target(svc, it)
+                target = lst.targets.get(it["id"])
                 if not target:
                     continue
                 tid = target["id"]
@@ -113,18 +102,8 @@ def _walk_sum(svc, folder_id, depth_left, follow_shortcuts, visited=None):
                 if visited is not None:
                     visited.add(tid)
                 if _is_folder(target):
-                    # respect depth if set
-                    if depth_left is None or depth_left > 1:
-                        subt = _walk_sum(
-                            svc,
-                            target["id"],
-                            (None if depth_left is None else depth_left - 1),
-                            follow_shortcuts,
-                            visited,
-                        )
-                        t2, f2, d2, s2 = subt
-                        total += t2; files += f2; folders += d2; skipped_native += s2
-                    else:
+                    # walk() lists the target itself when depth allows
+                    if not descends:
                         folders += 1
                 else:
                     size = target.get("size")
@@ -138,15 +117,6 @@ def _walk_sum(svc, folder_id, depth_left, follow_shortcuts, visited=None):
 
             if _is_folder(it):
                 folders += 1
-                if depth_left is None or depth_left > 1:
-                    t2, f2, d2, s2 = _walk_sum(
-                        svc,
-                        it["id"],
-                        (None if depth_left is None else depth_left - 1),
-                        follow_shortcuts,
-                        visited,
-                    )
-                    total += t2; files += f2; folders += d2; skipped_native += s2
             else:
                 size = it.get("size")
                 if size is not None:
@@ -154,11 +124,84 @@ def _walk_sum(svc, folder_id, depth_left, follow_shortcuts, visited=None):
                     files += 1
                 else:
                     skipped_native += 1
-        if not token:
-            break
 
     return total, files, folders, skipped_native
 
+def _fast_sum(svc, start_id, depth_limit, follow_shortcuts):
+    """
+    Same totals as _walk_sum from one flat scan of every visible file
+    (O(files/1000) calls instead of one per folder). The parent graph is built
+    in memory and summed in a single pass.
+    Returns ((total, files, folders, skipped_native), {subfolder: same tuple for its subtree}).
+    """
+    if start_id == "root":
+        start_id = execute(svc.files().get(fileId="root", fields="id"))["id"]
+
+    kids = {}     # parent id -> [(id, name, mimeType, size, shortcut target id)]
+    by_id = {}
+    for f in iter_files(svc, "id,name,mimeType,size,parents,shortcutDetails(targetId)"):
+        rec = (
+            f["id"], f.get("name") or "(unnamed)", f.get("mimeType"),
+            int(f["size"]) if f.get("size") is not None else None,
+            (f.get("shortcutDetails") or {}).get("targetId"),
+        )
+        by_id[rec[0]] = rec
+        for p in f.get("parents") or ():
+            kids.setdefault(p, []).append(rec)
+
+    totals = [0, 0, 0, 0]
+    per = {}      # top-level subfolder (id, name) -> [total, files, folders, skipped_native]
+
+    def add(bucket, i, n=1):
+        totals[i] += n
+        if bucket is not None:
+            per[bucket][i] += n
+
+    max_depth = None if depth_limit is None else max(1, depth_limit)
+    seen = {start_id}
+    queue = deque([(start_id, 0, None)])
+    while queue:
+        fid, depth, bucket = queue.popleft()
+        descends = max_depth is None or depth + 1 < max_depth
+        for cid, name, mt, size, tid in kids.get(fid, ()):
+            if mt == "application/vnd.google-apps.shortcut":
+                if not follow_shortcuts or not tid or tid in seen or tid not in by_id:
+                    continue
+                seen.add(tid)
+                cid, _tname, mt, size, _ = by_id[tid]
+                if mt == "application/vnd.google-apps.folder":
+                    if descends:
+                        sub = bucket or (cid, name)
+                        per.setdefault(sub, [0, 0, 0, 0])
+                        queue.append((cid, depth + 1, sub))
+                    else:
+                        add(bucket, 2)
+                    continue
+            elif mt == "application/vnd.google-apps.folder":
+                sub = bucket or (cid, name)
+                per.setdefault(sub, [0, 0, 0, 0])
+                add(bucket, 2)
+                if descends and cid not in seen:
+                    seen.add(cid)
+                    queue.append((cid, depth + 1, sub))
+                continue
+            if size is not None:
+                add(bucket, 0, size)
+                add(bucket, 1)
+            else:
+                add(bucket, 3)
+
+    return tuple(totals), {k: tuple(v) for k, v in per.items()}
+
+def _print_quota(svc, unit):
+    q = execute(svc.about().get(fields="storageQuota(limit,usage,usageInDrive,usageInDriveTrash)"))
+    sq = q.get("storageQuota") or {}
+    used = int(sq.get("usage") or 0)
+    limit = f"{_fmt_bytes(int(sq['limit']), unit)}" if sq.get("limit") else "unlimited"
+    print(f"  Quota:   {_fmt_bytes(used, unit)} used of {limit}"
+          f"  (Drive: {_fmt_bytes(int(sq.get('usageInDrive') or 0), unit)},"
+          f" trash: {_fmt_bytes(int(sq.get('usageInDriveTrash') or 0), unit)})")
+
 def _fmt_bytes(n, unit=None):
     if unit == "b":
         return f"{n} B"
@@ -178,7 +221,7 @@ def _fmt_bytes(n, unit=None):
         return f"{n/(kb**2):.2f} MB"
     return f"{n/(kb**3):.2f} GB"
 
-@command("size", "size [-L#] [-B|K|M|G] [--follow-shortcuts] [#]  - sum file sizes recursively")
+@command("size", "size [-L#] [-B|K|M|G] [--follow-shortcuts] [--fast] [#]  - sum file sizes recursively")
 def handle(ctx, args):
     args = normalize_compact_flags(args, int_flags=("-L",), assign_flags=())
     try:
@@ -190,7 +233,7 @@ def handle(ctx, args):
     if idx is not None:
         if not ctx.items:
             print("(no items in current view; run ls to fill the view first)"); return
-        if not (0 <= idx < len(ctx.items)):
+        if not has_index(ctx.items, idx):
             print(f"Index out of range (1-{len(ctx.items)})"); return
         start = ctx.items[idx]
         if not _is_folder(start):
@@ -200,19 +243,35 @@ def handle(ctx, args):
             if start.get("size") is None:
                 print("(note: Google-native file size not reported by Drive API)")
             return
-        start_id = start["id"]
         label = start.get("name","(unnamed)")
     else:
-        start_id = ctx.cwd["id"]
+        start = {"id": ctx.cwd["id"], "name": ctx.breadcrumb[-1]}
         label = ctx.breadcrumb[-1]
 
-    visited = set([start_id]) if opts["follow_shortcuts"] else None
+    if opts["fast"]:
+        (total, files, folders, skipped_native), per = _fast_sum(
+            ctx.svc, start["id"], opts["L"], opts["follow_shortcuts"]
+        )
+        print(f"{label}")
+        print(f"  Folders: {folders}  Files: {files}  (native-without-size: {skipped_native})")
+        print(f"  Total:   {_fmt_bytes(total, opts['unit'])}")
+        if start["id"] == "root":
+            _print_quota(ctx.svc, opts["unit"])
+        if per:
+            print("  Subfolders:")
+            for (_sid, name), (t, f, _d, _s) in sorted(per.items(), key=lambda kv: -kv[1][0]):
+                print(f"    {_fmt_bytes(t, opts['unit']):>12}  {f:>7} file(s)  {name}")
+        return
+
+    visited = set([start["id"]]) if opts["follow_shortcuts"] else None
+    sync(ctx.svc, ctx.cache)
     total, files, folders, skipped_native = _walk_sum(
         ctx.svc,
-        start_id,
+        start,
         opts["L"],  # None = full depth, int = levels
         opts["follow_shortcuts"],
         visited,
+        store=ctx.cache,
     )
     print(f"{label}")
     print(f"  Folders: {folders}  Files: {files}  (native-without-size: {skipped_native})")
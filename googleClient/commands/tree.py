@@ -1,9 +1,9 @@
 from . import command
-from ..api import list_children
-from ..display import normalize_display_name, clamp_to_terminal
-from ..api import get_meta
+from ..display import normalize_display_name, clamp_to_terminal, terminal_columns, LineBuffer
+from ..walk import walk
+from ..changes import sync
 from ..colors import load_colorizer, ensure_default_config
-from ..utils import normalize_compact_flags
+from ..utils import normalize_compact_flags, has_index
 
 _colorizer = None
 
@@ -16,12 +16,12 @@ def _color_item_name(item, text: str) -> str:
     style = _colorizer.style_for_item(item)
     return _colorizer.colorize(text, style)
 
-def _render_name(item, raw_text: str) -> str:
+def _render_name(item, raw_text: str, cols: int = None) -> str:
     """
     Normalize and clamp plain text to terminal width, then colorize.
     This ensures escape sequences don't break width calculation.
     """
-    disp = clamp_to_terminal(normalize_display_name(raw_text), reserve=0)
+    disp = clamp_to_terminal(normalize_display_name(raw_text), reserve=0, cols=cols)
     return _color_item_name(item, disp)
 
 def _parse_args(args):
@@ -88,94 +88,95 @@ def _is_folder(item):
 def _is_shortcut(item):
     return item.get("mimeType") == "application/vnd.google-apps.shortcut"
 
-def _fetch_children(svc, folder_id):
-    rows, token = [], None
-    while True:
-        batch, token = list_children(svc, folder_id, page_token=token)
-        rows.extend(batch)
-        if not token:
-            break
-    # sort: dirs first, then files, case-insensitive names
-    rows.sort(key=lambda it: (not _is_folder(it), (it.get("name") or "").lower()))
-    return rows
-
-def _resolve_shortcut_target(svc, shortcut_item):
-    """Return (target_meta_or_None, type_str) without raising."""
-    try:
-        # Get shortcutDetails; this field is only on files().get()
-        meta = svc.files().get(
-            fileId=shortcut_item["id"],
-            fields="id,name,mimeType,shortcutDetails(targetId,targetMimeType)",
-            supportsAllDrives=True,
-        ).execute()
-        det = meta.get("shortcutDetails") or {}
-        tid = det.get("targetId")
-        if not tid:
-            return None, None
-        targ = svc.files().get(
-            fileId=tid,
-            fields="id,name,mimeType",
-            supportsAllDrives=True,
-        ).execute()
-        return targ, targ.get("mimeType")
-    except Exception:
-        return None, None
-
-def _print_line(prefix, is_last, rendered_text: str):
-    """Print a single tree line. `rendered_text` should already be formatted & colored."""
+def _print_line(out, prefix, is_last, rendered_text: str):
+    """Queue a single tree line on `out` (a LineBuffer). `rendered_text` should already be formatted & colored."""
     branch = "└── " if is_last else "├── "
-    print(prefix + branch + rendered_text)
+    out.add(prefix + branch + rendered_text)
 
 def _next_prefix(prefix, is_last):
     return prefix + ("    " if is_last else "│   ")
 
-def _walk(svc, start_item, depth_left, opts, prefix="", visited=None):
-    """
-    Print children of start_item (assumed folder or shortcut-resolved folder).
-    """
-    if depth_left == 0:
-        return
-
-    children = _fetch_children(svc, start_item["id"])
+def _sorted_children(listing, opts):
+    rows = list(listing.children) if listing else []
     if opts["dirs_only"]:
-        children = [c for c in children if _is_folder(c)]
-
-    for idx, child in enumerate(children):
-        is_last = (idx == len(children) - 1)
+        rows = [c for c in rows if _is_folder(c)]
+    # sort: dirs first, then files, case-insensitive names
+    rows.sort(key=lambda it: (not _is_folder(it), (it.get("name") or "").lower()))
+    return rows
 
-        # Shortcuts handling
-        if _is_shortcut(child):
-            if not opts["follow_shortcuts"]:
-                # Show as leaf with '->' note, don't traverse
-                txt = _render_name(child, f"{child.get('name','(unnamed)')} -> shortcut")
-                _print_line(prefix, is_last, txt)
-                continue
-            # Follow the target, but avoid cycles
-            target, t_mime = _resolve_shortcut_target(svc, child)
-            if not target:
-                txt = _render_name(child, f"{child.get('name','(unnamed)')} -> [broken shortcut]")
-                _print_line(prefix, is_last, txt)
+def _render(stream, start, opts, visited, out, cols):
+    """
+    Print the tree under `start` in sorted, depth-first order while listings
+    stream in (in whatever order they complete). Lines are buffered on `out`
+    and flushed whenever rendering has to wait for a listing.
+    """
+    listed = {}
+    stack = []                          # [rows, next_index, prefix, depth_left, targets]
+    want = (start["id"], "", opts["L"]) # folder whose listing must arrive before we can continue
+
+    def pump():
+        nonlocal want
+        while True:
+            if want is not None:
+                fid, prefix, depth_left = want
+                if fid not in listed:
+                    out.flush()
+                    return False
+                lst = listed[fid]
+                stack.append([_sorted_children(lst, opts), 0, prefix, depth_left, lst.targets if lst else {}])
+                want = None
+            if not stack:
+                out.flush()
+                return True
+            frame = stack[-1]
+            rows, i, prefix, depth_left, targets = frame
+            if i >= len(rows):
+                stack.pop()
                 continue
-            if visited is not None and target["id"] in visited:
-                txt = _render_name(child, f"{child.get('name','(unnamed)')} -> {target.get('name','(target)')}  ↪ (seen)")
-                _print_line(prefix, is_last, txt)
+            frame[1] += 1
+            child = rows[i]
+            is_last = (i == len(rows) - 1)
+            name = child.get("name", "(unnamed)")
+
+            # Shortcuts handling
+            if _is_shortcut(child):
+                if not opts["follow_shortcuts"]:
+                    # Show as leaf with '->' note, don't traverse
+                    _print_line(out, prefix, is_last, _render_name(child, f"{name} -> shortcut", cols))
+                    continue
+                # Follow the target, but avoid cycles
+                target = targets.get(child["id"])
+                if not target:
+                    _print_line(out, prefix, is_last, _render_name(child, f"{name} -> [broken shortcut]", cols))
+                    continue
+                if visited is not None and target["id"] in visited:
+                    _print_line(out, prefix, is_last, _render_name(child, f"{name} -> {target.get('name','(target)')}  ↪ (seen)", cols))
+                    continue
+                # Print the shortcut name pointing to target
+                _print_line(out, prefix, is_last, _render_name(child, f"{name} -> {target.get('name','(target)')}", cols))
+                if _is_folder(target) and depth_left > 1:
+                    if visited is not None:
+                        visited.add(target["id"])
+                    want = (target["id"], _next_prefix(prefix, is_last), depth_left - 1)
                 continue
-            # Print the shortcut name pointing to target
-            shown = _render_name(child, f"{child.get('name','(unnamed)')} -> {target.get('name','(target)')}")
-            _print_line(prefix, is_last, shown)
-            if t_mime == "application/vnd.google-apps.folder" and depth_left > 1:
-                if visited is not None:
-                    visited.add(target["id"])
-                _walk(svc, target, depth_left - 1, opts, _next_prefix(prefix, is_last), visited)
-            continue
 
-        # Normal items
-        txt = _render_name(child, child.get("name", "(unnamed)"))
-        _print_line(prefix, is_last, txt)
+            # Normal items
+            _print_line(out, prefix, is_last, _render_name(child, name, cols))
+
+            # Descend into folders
+            if _is_folder(child) and depth_left > 1:
+                want = (child["id"], _next_prefix(prefix, is_last), depth_left - 1)
 
-        # Recurse into folders
-        if _is_folder(child) and depth_left > 1:
-            _walk(svc, child, depth_left - 1, opts, _next_prefix(prefix, is_last), visited)
+    if pump():
+        return
+    for lst in stream:
+        listed[lst.folder["id"]] = lst
+        if pump():
+            return
+    # stream ended without a listing we need (should not happen): render it as empty
+    while want is not None:
+        listed.setdefault(want[0], None)
+        pump()
 
 @command("tree", "tree [-L#] [-d] [--follow-shortcuts] [#]  - print a directory tree, limit recursion with -L")
 def handle(ctx, args):
@@ -193,7 +194,7 @@ def handle(ctx, args):
     if maybe_idx is not None:
         if not ctx.items:
             print("(no items in current view; run ls to fill the view first)"); return
-        if not (0 <= maybe_idx < len(ctx.items)):
+        if not has_index(ctx.items, maybe_idx):
             print(f"Index out of range (1-{len(ctx.items)})"); return
         start = ctx.items[maybe_idx]
         # If an indexed file is chosen: print its name only
@@ -205,5 +206,14 @@ def handle(ctx, args):
 
     # Root line (colorized as folder)
     print(_render_name(start, start.get("name","(unnamed)")))
+    if opts["L"] == 0:
+        return
     visited = set([start["id"]]) if opts["follow_shortcuts"] else None
-    _walk(ctx.svc, start, opts["L"], opts, prefix="", visited=visited)
+    sync(ctx.svc, ctx.cache)
+    stream = walk(ctx.svc, [start], max_depth=opts["L"], follow_shortcuts=opts["follow_shortcuts"], store=ctx.cache)
+    out = LineBuffer()
+    try:
+        _render(stream, start, opts, visited, out, terminal_columns())
+    finally:
+        out.flush()
+        stream.close()
@@ -0,0 +1,67 @@
+# googleClient/commands/verify.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+from . import command
+from ..journal import DownloadJournal, JOURNAL_NAME
+from ..utils import file_md5, normalize_compact_flags, pop_jobs_flag
+
+USAGE = "Usage: verify [--into <dir>] [-j <n>]"
+
+def _check(entry):
+    # runs in a worker process: (id, path, md5, size) -> (id, path, status)
+    fid, path, md5, size = entry
+    try:
+        if size is not None and os.path.getsize(path) != size:
+            return fid, path, "size"
+        if not md5:
+            return fid, path, "unchecked"
+        return fid, path, "ok" if file_md5(path) == md5 else "mismatch"
+    except FileNotFoundError:
+        return fid, path, "missing"
+    except OSError:
+        return fid, path, "unreadable"
+
+@command("verify", "verify [--into <dir>] [-j <n>]  - re-hash files mget downloaded and compare with Drive's md5")
+def handle(ctx, args):
+    """
+    Re-hash every completed download recorded in <dir>'s journal (default: current
+    directory) on -j worker processes (default: one per CPU) and compare with the
+    md5Checksum Drive reported. Bad or missing files are marked incomplete so the
+    next mget into <dir> fetches them again. Google-native exports have no checksum.
+    """
+    args = normalize_compact_flags(args, int_flags=("-j",), assign_flags=("--into", "--jobs"))
+    try:
+        jobs, args = pop_jobs_flag(args, default=os.cpu_count() or 1)
+    except ValueError as e:
+        print(e); return
+    root = os.getcwd()
+    if args[:1] == ["--into"] and len(args) == 2:
+        root = args[1]
+    elif args:
+        print(USAGE); return
+    if not os.path.exists(os.path.join(root, JOURNAL_NAME)):
+        print(f"(no download journal in {root}; run mget --into {root} first)"); return
+
+    journal = DownloadJournal(root)
+    results, bad = [], []
+    try:
+        entries = journal.entries()
+        if jobs > 1 and len(entries) > 1:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(entries))) as ex:
+                results = list(ex.map(_check, entries, chunksize=16))
+        else:
+            results = [_check(e) for e in entries]
+        bad = [(fid, path, status) for fid, path, status in results if status not in ("ok", "unchecked")]
+        for _fid, path, status in bad:
+            print(f"   [!] {status:10s} {os.path.relpath(path, root)}")
+        journal.invalidate([(fid, path) for fid, path, _s in bad])
+    finally:
+        journal.close()
+
+    counts = {}
+    for _fid, _path, status in results:
+        counts[status] = counts.get(status, 0) + 1
+    print(f"[✓] Checked {len(results)} file(s).  OK: {counts.get('ok', 0)}.  "
+          f"Bad: {len(bad)}.  No checksum: {counts.get('unchecked', 0)}.")
+    if bad:
+        print(f"    Run mget again with --into {root} to re-download them.")
@@ -1,4 +1,4 @@
-import shutil, re, unicodedata
+import shutil, re, sys, unicodedata
 from .utils import sanitize
 from .colors import load_colorizer, ensure_default_config
 
@@ -16,24 +16,61 @@ def _color_name(item, text: str) -> str:
     return _colorizer.colorize(text, style)
 
 def normalize_display_name(name: str) -> str:
+    if name.isprintable():
+        # common case: nothing to strip (isprintable() is False for every category C char)
+        return (re.sub(r"\s{2,}", " ", name) if "  " in name else name).strip()
     s = name.replace("\r", "").replace("\n", "␠").replace("\t", "␠")
     s = "".join(ch for ch in s if ch.isprintable() and not unicodedata.category(ch).startswith("C"))
     s = re.sub(r"\s{2,}", " ", s)
     return s.strip()
 
-def clamp_to_terminal(s: str, reserve: int = 60) -> str:
-    cols = shutil.get_terminal_size(fallback=(120, 24)).columns
-    maxw = max(10, cols - reserve)
+def terminal_columns() -> int:
+    return shutil.get_terminal_size(fallback=(120, 24)).columns
+
+def clamp_to_terminal(s: str, reserve: int = 60, cols: int = None) -> str:
+    """Pass cols (see terminal_columns) when clamping many lines."""
+    maxw = max(10, (cols or terminal_columns()) - reserve)
     return s if len(s) <= maxw else (s[:maxw-1] + "…")
 
-def print_table(items):
+class LineBuffer:
+    """Collects output lines and writes them to stdout in large chunks."""
+    def __init__(self, limit: int = 1 << 16):
+        self.limit = limit
+        self._lines = []
+        self._size = 0
+
+    def add(self, line: str):
+        self._lines.append(line)
+        self._size += len(line) + 1
+        if self._size >= self.limit:
+            self.flush()
+
+    def flush(self):
+        if self._lines:
+            self._lines.append("")
+            sys.stdout.write("\n".join(self._lines))
+            sys.stdout.flush()
+            self._lines = []
+            self._size = 0
+
+def print_table(items, start=1, label=None):
+    """
+    Numbered listing; start > 1 continues the numbering of an earlier page.
+    label(item) replaces the name column (e.g. with a path).
+    """
     if not items:
-        print("(empty)"); return
-    for i, it in enumerate(items, start=1):
-        typ = "DIR " if it.get("mimeType") == "application/vnd.google-apps.folder" else it.get("mimeType","")[:28]
+        if start == 1:
+            print("(empty)")
+        return
+    cols = terminal_columns()
+    out = LineBuffer()
+    for i, it in enumerate(items, start=start):
+        mt = it.get("mimeType","")
+        typ = "DIR " if mt == "application/vnd.google-apps.folder" else mt[:28]
         mod = it.get("modifiedTime","")[:19].replace("T"," ")
         name = _color_name(
             it,
-            clamp_to_terminal(normalize_display_name(it.get("name", "")))
+            clamp_to_terminal(normalize_display_name(label(it) if label else it.get("name", "")), cols=cols)
         )
-        print(f"{i:>3}. {typ:<32} {mod:<19} {name}")
+        out.add(f"{i:>3}. {typ:<32} {mod:<19} {name}")
+    out.flush()
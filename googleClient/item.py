@@ -0,0 +1,141 @@
+# googleClient/item.py
+import re, sys, threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from datetime import datetime, timezone
+
+# Drive's own timestamp format; anything else is kept verbatim
+_TS = re.compile(r"^\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{3}Z$")
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# shared values: one object per distinct owners list / permission set, LRU-bounded so a
+# long session over many distinct sharing setups doesn't grow it without limit
+SHARED_MAX = 4096
+_shared = OrderedDict()
+_shared_lock = threading.Lock()
+
+def _share(v):
+    with _shared_lock:
+        got = _shared.get(v)
+        if got is not None:
+            _shared.move_to_end(v)
+            return got
+        _shared[v] = v
+        if len(_shared) > SHARED_MAX:
+            _shared.popitem(last=False)
+        return v
+
+def _s(v):
+    return sys.intern(v) if isinstance(v, str) else v
+
+def _records(rows):
+    # [{...}, ...] -> shared tuple of shared (key, value) tuples with interned strings
+    if rows is None:
+        return None
+    try:
+        return _share(tuple(_share(tuple((sys.intern(k), _s(v)) for k, v in r.items())) for r in rows))
+    except TypeError:
+        return rows   # nested values (unhashable): keep as they are
+
+def _dicts(recs):
+    return [dict(rec) for rec in recs]
+
+class Item(Mapping):
+    """
+    Compact read-only stand-in for a Drive file dict (see compact()).
+    Repeated strings are interned, owners/permissions are shared tuples, size is an int
+    and modifiedTime is kept as epoch milliseconds; .get()/[] return the same values
+    (and types) the JSON dict had. Unknown fields go to a small overflow dict.
+    """
+    __slots__ = ("id", "name", "mimeType", "_mtime", "_size", "driveId", "md5Checksum",
+                 "_owners", "_perms", "_shortcut", "_extra")
+
+    def __init__(self, row):
+        g = row.get
+        self.id = g("id")
+        self.name = g("name")
+        self.mimeType = _s(g("mimeType"))
+        mt = g("modifiedTime")
+        if mt is not None and _TS.match(mt):
+            dt = datetime.strptime(mt, "%Y-%m-%dT%H:%M:%S.%fZ").replace(tzinfo=timezone.utc)
+            mt = (dt - _EPOCH) // _MS
+        self._mtime = mt
+        self._size = int(row["size"]) if g("size") is not None else None
+        self.driveId = _s(g("driveId"))
+        self.md5Checksum = g("md5Checksum")
+        self._owners = _records(g("owners"))
+        self._perms = _records(g("permissions"))
+        sd = g("shortcutDetails")
+        self._shortcut = None if sd is None else (sd.get("targetId"), _s(sd.get("targetMimeType")))
+        extra = {k: v for k, v in row.items() if k not in _KNOWN}
+        self._extra = extra or None
+
+    @property
+    def mtime(self):
+        """modifiedTime as epoch seconds (None if missing or not in Drive's format)."""
+        return self._mtime / 1000 if isinstance(self._mtime, int) else None
+
+    def _value(self, key):
+        if key in _DIRECT:
+            return getattr(self, key)
+        if key == "modifiedTime":
+            mt = self._mtime
+            if isinstance(mt, int):
+                dt = datetime.fromtimestamp(mt / 1000, timezone.utc)
+                return dt.strftime("%Y-%m-%dT%H:%M:%S.") + f"{mt % 1000:03d}Z"
+            return mt
+        if key == "size":
+            return None if self._size is None else str(self._size)
+        if key == "owners":
+            return None if self._owners is None else _dicts(self._owners)
+        if key == "permissions":
+            return None if self._perms is None else _dicts(self._perms)
+        if key == "shortcutDetails":
+            if self._shortcut is None:
+                return None
+            return {k: v for k, v in zip(("targetId", "targetMimeType"), self._shortcut) if v is not None}
+        return (self._extra or {}).get(key)
+
+    def __getitem__(self, key):
+        v = self._value(key)
+        if v is None:
+            raise KeyError(key)
+        return v
+
+    def get(self, key, default=None):
+        v = self._value(key)
+        return default if v is None else v
+
+    def __contains__(self, key):
+        return self._value(key) is not None
+
+    def __iter__(self):
+        for k in _FIELDS:
+            if self._value(k) is not None:
+                yield k
+        yield from (self._extra or ())
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"Item({dict(self)!r})"
+
+_MS = datetime(1970, 1, 1, 0, 0, 0, 1000, tzinfo=timezone.utc) - _EPOCH
+_DIRECT = ("id", "name", "mimeType", "driveId", "md5Checksum")
+_FIELDS = ("id", "name", "mimeType", "modifiedTime", "size", "owners", "permissions",
+           "driveId", "md5Checksum", "shortcutDetails")
+_KNOWN = frozenset(_FIELDS)
+
+def compact(row):
+    """Item for a Drive file dict (Items pass through)."""
+    return row if isinstance(row, Item) or row is None else Item(row)
+
+def compact_all(rows):
+    return [compact(r) for r in rows]
+
+def plain(o):
+    """json.dumps default=: Items serialize as the dict they stand for."""
+    if isinstance(o, Item):
+        return dict(o)
+    raise TypeError(f"{type(o).__name__} is not JSON serializable")
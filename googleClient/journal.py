@@ -0,0 +1,111 @@
+# googleClient/journal.py
+import os, sqlite3, threading
+from .constants import EXPORT_MAP
+
+JOURNAL_NAME = ".gC-journal.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS downloads (
+    id        TEXT NOT NULL,
+    path      TEXT NOT NULL,
+    md5       TEXT,
+    modified  TEXT,
+    size      INTEGER,
+    complete  INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (id, path)
+);
+"""
+
+class DownloadJournal:
+    """
+    Record of what mget has fetched under an --into root (id, md5Checksum,
+    modifiedTime, size), one row per local path (a file reached through several
+    folders has several), so a rerun can skip unchanged files and resume partial
+    ones. Safe to share between download workers.
+    force=True fetches everything again but still records it.
+    """
+    def __init__(self, root, force=False):
+        self.force = force
+        self.path = os.path.join(root, JOURNAL_NAME)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            pk = [c[1] for c in self._db.execute("PRAGMA table_info(downloads)") if c[5]]
+            if pk == ["id"]:
+                # journals written before files could be planned at several paths: one row per id
+                self._db.execute("ALTER TABLE downloads RENAME TO downloads_v1")
+                self._db.executescript(_SCHEMA)
+                self._db.execute("INSERT INTO downloads SELECT id, path, md5, modified, size, complete FROM downloads_v1")
+                self._db.execute("DROP TABLE downloads_v1")
+            self._db.executescript(_SCHEMA)
+            self._db.commit()
+
+    def check(self, item, out_path):
+        """
+        Decide how to fetch item into out_path: ("skip", 0), ("resume", offset) or ("full", 0).
+        Exported Google-native docs are re-exported only when modifiedTime changed.
+        """
+        if self.force:
+            return "full", 0
+        out_path = os.path.abspath(out_path)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT md5, modified, size, complete FROM downloads WHERE id=? AND path=?", (item["id"], out_path)
+            ).fetchone()
+        if not row or not os.path.exists(out_path):
+            return "full", 0
+        md5, modified, size, complete = row
+        if item.get("mimeType") in EXPORT_MAP:
+            if complete and modified and modified == item.get("modifiedTime"):
+                return "skip", 0
+            return "full", 0
+
+        if md5 and item.get("md5Checksum"):
+            same = md5 == item["md5Checksum"]
+        else:
+            same = bool(modified) and modified == item.get("modifiedTime") and size == _size(item)
+        if not same:
+            return "full", 0
+        have = os.path.getsize(out_path)
+        want = _size(item)
+        if complete and (want is None or have == want):
+            return "skip", 0
+        if not complete and want and 0 < have < want:
+            return "resume", have
+        return "full", 0
+
+    def begin(self, item, out_path):
+        out_path = os.path.abspath(out_path)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO downloads(id, path, md5, modified, size, complete) VALUES (?,?,?,?,?,0)",
+                (item["id"], out_path, item.get("md5Checksum"), item.get("modifiedTime"), _size(item)),
+            )
+            self._db.commit()
+
+    def finish(self, file_id, out_path):
+        with self._lock:
+            self._db.execute("UPDATE downloads SET complete=1 WHERE id=? AND path=?",
+                             (file_id, os.path.abspath(out_path)))
+            self._db.commit()
+
+    def entries(self):
+        """[(id, path, md5, size)] of every completed download."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT id, path, md5, size FROM downloads WHERE complete=1 ORDER BY path"
+            ).fetchall()
+
+    def invalidate(self, entries):
+        """Mark (id, path) downloads as incomplete so the next mget fetches them again."""
+        with self._lock:
+            self._db.executemany("UPDATE downloads SET complete=0 WHERE id=? AND path=?", list(entries))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+def _size(item):
+    return int(item["size"]) if item.get("size") is not None else None
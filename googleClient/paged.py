@@ -0,0 +1,76 @@
+# googleClient/paged.py
+from collections.abc import Sequence
+from .api import list_children, LIST_FIELDS
+from .item import compact_all
+
+class PagedListing(Sequence):
+    """
+    A folder's children, fetched one files().list page at a time as they are needed.
+    Indexing only loads the pages up to that row, so `get 5` works while a 30k-item
+    folder is still being listed; len(), negative indexes and slices load everything.
+    Rows keep their position, so numbering is stable.
+    on_complete(rows) is called once the last page has arrived (e.g. to cache the listing).
+    """
+    def __init__(self, svc, folder_id, fields=LIST_FIELDS, on_complete=None):
+        self.svc = svc
+        self.folder_id = folder_id
+        self.fields = fields
+        self.on_complete = on_complete
+        self._rows = []
+        self._token = None
+        self.complete = False
+
+    @property
+    def loaded(self):
+        return len(self._rows)
+
+    def next_page(self):
+        """Fetch the next page; returns its rows ([] once complete)."""
+        if self.complete:
+            return []
+        rows, self._token = list_children(
+            self.svc, self.folder_id, page_token=self._token, fields=self.fields
+        )
+        rows = compact_all(rows)
+        self._rows.extend(rows)
+        if not self._token:
+            self.complete = True
+            if self.on_complete:
+                self.on_complete(self._rows)
+        return rows
+
+    def pages(self):
+        """Yield each page as it arrives (pages already loaded first, as one chunk)."""
+        if self._rows:
+            yield list(self._rows)
+        while not self.complete:
+            rows = self.next_page()
+            if rows:
+                yield rows
+
+    def has(self, i):
+        """True if row i (0-based) exists, loading pages only as far as needed."""
+        while i >= len(self._rows) and not self.complete:
+            self.next_page()
+        return 0 <= i < len(self._rows)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice) or i < 0:
+            self.has(float("inf"))
+            return self._rows[i]
+        if not self.has(i):
+            raise IndexError(i)
+        return self._rows[i]
+
+    def __len__(self):
+        self.has(float("inf"))
+        return len(self._rows)
+
+    def __bool__(self):
+        return self.has(0)
+
+    def __iter__(self):
+        i = 0
+        while self.has(i):
+            yield self._rows[i]
+            i += 1
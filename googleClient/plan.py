@@ -0,0 +1,165 @@
+# googleClient/plan.py
+import os
+from collections import namedtuple
+from .api import DOWNLOAD_FIELDS, output_path
+from .batch import resolve_shortcuts
+from .constants import EXPORT_MAP, FOLDER, SHORTCUT
+from .transfer import ObjectStore
+from .utils import sanitize
+from .walk import walk
+
+# item: what DownloadPool fetches; outdir: directory relative to the --into root;
+# label: path shown to the user (relative to the root)
+Entry = namedtuple("Entry", "item outdir label")
+
+def _as_download(it, name):
+    # the item's content under the (shortcut's) display name
+    d = {"id": it.get("id"), "name": name, "mimeType": it.get("mimeType")}
+    for k in ("size", "md5Checksum", "modifiedTime"):
+        if it.get(k) is not None:
+            d[k] = it[k]
+    return d
+
+def _with_id(e):
+    # the entry under "<name> (<id>)", keeping the extension output_path would use
+    it = e.item
+    root, ext = (it["name"], "") if it.get("mimeType") in EXPORT_MAP else os.path.splitext(it["name"])
+    name = f"{root} ({it['id']}){ext}"
+    return Entry(dict(it, name=name), e.outdir, os.path.join(os.path.dirname(e.label), sanitize(name)))
+
+class Plan:
+    """
+    Every file an mget will fetch, one entry per (Drive id, directory), worked out
+    before anything is downloaded. Shortcut loops back to an ancestor folder are
+    recorded in `cycles`; folders reached again another way (diamonds), and files
+    reached again in the same directory, are planned once and counted in `duplicates`.
+    A file reached in several directories is written to each (`repeats` counts the
+    extra paths); fetching its content once is left to the ObjectStore (--dedupe).
+    Different files that would land on the same path (Drive allows equal names in a
+    folder) get their id appended, all but the smallest id, so reruns pick the same
+    names; `renamed` counts them.
+    """
+    def __init__(self):
+        self.entries = []
+        self.skipped_folders = 0
+        self.duplicates = 0
+        self.cycles = []        # (shortcut path, path of the ancestor it points back to)
+        self.broken = []        # shortcut paths whose target couldn't be resolved
+        self.repeats = 0        # entries whose id is already planned at another path
+        self.renamed = 0        # entries given their id as a suffix to avoid a name clash
+        self._seen = set()      # (id, outdir)
+        self._ids = set()
+        self._paths = {}        # output path -> index in entries
+
+    def add(self, item, outdir, label):
+        key = (item["id"], outdir)
+        if key in self._seen:
+            self.duplicates += 1
+            return
+        self._seen.add(key)
+        if item["id"] in self._ids:
+            self.repeats += 1
+        self._ids.add(item["id"])
+        e = Entry(item, outdir, label)
+        path = output_path(item, outdir)
+        other = self._paths.get(path)
+        if other is not None:
+            self.renamed += 1
+            if item["id"] < self.entries[other].item["id"]:
+                moved = self.entries[other] = _with_id(self.entries[other])
+                self._paths[output_path(moved.item, outdir)] = other
+            else:
+                e = _with_id(e)
+                path = output_path(e.item, outdir)
+        self._paths[path] = len(self.entries)
+        self.entries.append(e)
+
+    @property
+    def bytes(self):
+        return sum(int(e.item.get("size") or 0) for e in self.entries)
+
+    @property
+    def exports(self):
+        """Entries exported from Google-native formats (their size is unknown up front)."""
+        return sum(1 for e in self.entries if e.item.get("mimeType") in EXPORT_MAP)
+
+    def needed(self, root, journal=None, dedupe=False):
+        """
+        Bytes still to download into root: files the journal will skip don't count,
+        and with dedupe each distinct content counts once.
+        """
+        keys, total = set(), 0
+        for e in self.entries:
+            if journal is not None:
+                action, _off = journal.check(e.item, output_path(e.item, os.path.join(root, e.outdir)))
+                if action == "skip":
+                    continue
+            if dedupe:
+                k = ObjectStore.key(e.item)
+                if k in keys:
+                    continue
+                keys.add(k)
+            total += int(e.item.get("size") or 0)
+        return total
+
+def _loops_back(folder_id, from_id, parent_of):
+    # True if folder_id is from_id or one of its ancestors in the planned tree
+    cur = from_id
+    while cur is not None:
+        if cur == folder_id:
+            return True
+        cur = parent_of.get(cur)
+    return False
+
+def build_plan(svc, selected, recursive=False, max_depth=None, follow_shortcuts=False):
+    """Plan for downloading `selected` (items of the current view), walking folders if recursive."""
+    plan = Plan()
+    targets = resolve_shortcuts(svc, selected) if follow_shortcuts else {}
+    roots = []
+    rel_of = {}      # folder id -> path relative to the --into root
+    parent_of = {}   # folder id -> folder it was planned under (None for roots)
+    for it in selected:
+        name = it.get("name") or "unnamed"
+        if it.get("mimeType") == SHORTCUT and follow_shortcuts:
+            tgt = targets.get(it["id"])
+            if tgt:
+                it = tgt
+            else:
+                plan.broken.append(name)
+        if it.get("mimeType") == FOLDER:
+            if not recursive:
+                plan.skipped_folders += 1
+            elif it["id"] in rel_of:
+                plan.duplicates += 1
+            else:
+                rel_of[it["id"]] = sanitize(name)
+                parent_of[it["id"]] = None
+                roots.append(it)
+            continue
+        plan.add(_as_download(it, name), "", sanitize(name))
+
+    # walk lists every folder id once, parents before children
+    for lst in walk(svc, roots, max_depth=max_depth, follow_shortcuts=follow_shortcuts, fields=DOWNLOAD_FIELDS):
+        fid = lst.folder["id"]
+        rel = rel_of[fid]
+        for child in lst.children:
+            cname = child.get("name") or "unnamed"
+            child_rel = os.path.join(rel, sanitize(cname))
+            if child.get("mimeType") == SHORTCUT and follow_shortcuts:
+                tgt = lst.targets.get(child["id"])
+                if tgt:
+                    child = tgt
+                else:
+                    plan.broken.append(child_rel)
+            if child.get("mimeType") == FOLDER:
+                cid = child["id"]
+                if cid not in rel_of:
+                    rel_of[cid] = child_rel
+                    parent_of[cid] = fid
+                elif _loops_back(cid, fid, parent_of):
+                    plan.cycles.append((child_rel, rel_of[cid]))
+                else:
+                    plan.duplicates += 1
+                continue
+            plan.add(_as_download(child, cname), rel, child_rel)
+    return plan
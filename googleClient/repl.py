@@ -7,22 +7,28 @@ except ImportError:
 from .commands import REGISTRY
 from .display import print_table
 from .utils import normalize_compact_flags
+from .store import MetaStore
 
 class Ctx:
-    def __init__(self, svc, user_email):
+    def __init__(self, svc, user_email, cache=None):
         self.svc = svc
         self.user_email = user_email
         self.cwd = {"id": "root", "name": "My Drive"}
         self.breadcrumb = ["My Drive"]
         self.items = []
-        self.cache = {}
+        # persistent listing/metadata cache (see store.MetaStore)
+        self.cache = cache if cache is not None else MetaStore(user_email)
+        # messages from background work (e.g. the startup about() check), shown before the next prompt
+        self.notices = []
+        # binary stdout kept for mget --archive - (gC --pipe); None when stdout is the shell's
+        self.stdout = None
 
-from .commands import REGISTRY
+from .commands import REGISTRY, load_all
 
 def show_help():
     # Build rows of (usage, desc) and compute column width
     rows = []
-    for name in sorted(REGISTRY):
+    for name in sorted(load_all()):
         hl = REGISTRY[name].get("help", "").strip()
         # Normalize: ensure usage starts with the command name
         if not hl or not hl.lower().startswith(name.lower()):
@@ -65,29 +71,42 @@ def loop(ctx: Ctx):
         atexit.register(lambda: readline.write_history_file(histfile))
 
     while True:
+        while ctx.notices:
+            print(ctx.notices.pop(0))
         try:
             line = input(f"[{ctx.breadcrumb[-1]} - {ctx.user_email}]$ ").strip()
         except (EOFError, KeyboardInterrupt):
             print(); return
-        if not line:
-            continue
-        parts = line.split()
-        cmd, args = parts[0], parts[1:]
-        # normalize args (handle flags like -L, --into, etc.)
-        args = normalize_compact_flags(
-            args,
-            int_flags=("-L",), 
-            assign_flags=("--into", "--mime", "--type")
-        )
-        if cmd in ("quit","exit"):
+        if run_line(ctx, line) is False:
             return
-        if cmd == "help":
-            show_help()
-            continue
+
+def run_line(ctx: Ctx, line: str):
+    """
+    Run one command line against ctx. Returns False for quit/exit, None if the
+    command raised (the error is printed), True otherwise.
+    """
+    parts = line.split()
+    if not parts:
+        return True
+    cmd, args = parts[0], parts[1:]
+    # normalize args (handle flags like -L, --into, etc.)
+    args = normalize_compact_flags(
+        args,
+        int_flags=("-L", "-j"),
+        assign_flags=("--into", "--mime", "--type", "--jobs")
+    )
+    if cmd in ("quit","exit"):
+        return False
+    if cmd == "help":
+        show_help()
+        return True
+    try:
+        # first use of a command imports its module
         h = REGISTRY.get(cmd)
         if not h:
-            print("Unknown command. Type 'help'."); continue
-        try:
-            h["fn"](ctx, args)
-        except Exception as e:
-            print(f"[!] {e}")
+            print("Unknown command. Type 'help'."); return True
+        h["fn"](ctx, args)
+    except Exception as e:
+        print(f"[!] {e}")
+        return None
+    return True
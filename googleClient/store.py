@@ -0,0 +1,353 @@
+# googleClient/store.py
+import os, re, json, time, sqlite3, threading
+from datetime import datetime
+from .cache import covers
+from .item import compact, compact_all, plain
+
+# Per-entry staleness: a listing whose newest child changed long ago is trusted longer.
+# ttl = (time since newest change) / TTL_FACTOR, clamped to [MIN_TTL, MAX_TTL].
+MIN_TTL = 60
+MAX_TTL = 24 * 3600
+EMPTY_TTL = 3600
+TTL_FACTOR = 10
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    folder_id  TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    ttl        REAL NOT NULL,
+    rows       TEXT NOT NULL,
+    targets    TEXT,
+    fields     TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    id         TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    data       TEXT NOT NULL,
+    etag       TEXT
+);
+CREATE TABLE IF NOT EXISTS parents (
+    id        TEXT NOT NULL,
+    parent_id TEXT NOT NULL,
+    PRIMARY KEY (id, parent_id)
+);
+CREATE TABLE IF NOT EXISTS state (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS names (
+    id        TEXT NOT NULL,
+    parent_id TEXT NOT NULL,
+    name      TEXT NOT NULL,
+    data      TEXT NOT NULL,
+    PRIMARY KEY (id, parent_id)
+);
+CREATE INDEX IF NOT EXISTS names_parent ON names(parent_id);
+"""
+
+# trigram full-text index over names (SQLite >= 3.34); substring lookups fall back to LIKE without it
+_FTS = """
+CREATE VIRTUAL TABLE IF NOT EXISTS names_fts USING fts5(name, content='names', content_rowid='rowid', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS names_ai AFTER INSERT ON names BEGIN
+    INSERT INTO names_fts(rowid, name) VALUES (new.rowid, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS names_ad AFTER DELETE ON names BEGIN
+    INSERT INTO names_fts(names_fts, rowid, name) VALUES ('delete', old.rowid, old.name);
+END;
+"""
+
+def _cache_dir() -> str:
+    if os.environ.get("GC_CACHE_DIR"):
+        return os.path.expanduser(os.environ["GC_CACHE_DIR"])
+    return os.path.join(os.path.expanduser("~"), ".config", "gC", "cache")
+
+def _ts(s):
+    try:
+        return datetime.fromisoformat(s.replace("Z", "+00:00")).timestamp()
+    except Exception:
+        return None
+
+def listing_ttl(rows, now=None) -> float:
+    now = now or time.time()
+    # compact items carry modifiedTime already parsed
+    stamps = [t for t in (getattr(r, "mtime", None) or _ts(r.get("modifiedTime") or "") for r in rows) if t]
+    if not stamps:
+        return EMPTY_TTL
+    quiet = max(0.0, now - max(stamps))
+    return min(MAX_TTL, max(MIN_TTL, quiet / TTL_FACTOR))
+
+class MetaStore:
+    """
+    Write-through SQLite cache for one impersonated user: folder listings,
+    parent links and get_meta results. Safe to share between threads.
+    """
+    def __init__(self, user_email, path=None):
+        if path is None:
+            safe_user = re.sub(r'[^A-Za-z0-9_.@-]', '_', user_email)
+            path = os.path.join(_cache_dir(), f"{safe_user}.sqlite")
+        if path != ":memory:":
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            except OSError:
+                path = ":memory:"
+        self.path = path
+        self._lock = threading.Lock()
+        # set by changes.sync(): listings fetched since tracking began are kept
+        # correct by applied changes, so their TTL no longer applies
+        self.synced = False
+        self.polled_at = 0.0
+        try:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+        except sqlite3.Error:
+            self.path = ":memory:"
+            self._db = sqlite3.connect(":memory:", check_same_thread=False)
+        with self._lock:
+            if self.path != ":memory:":
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_SCHEMA)
+            try:
+                # caches written before field projections existed hold full rows
+                self._db.execute("ALTER TABLE listings ADD COLUMN fields TEXT")
+            except sqlite3.OperationalError:
+                pass
+            try:
+                # likewise for metadata cached before ETags were kept
+                self._db.execute("ALTER TABLE meta ADD COLUMN etag TEXT")
+            except sqlite3.OperationalError:
+                pass
+            try:
+                self._db.executescript(_FTS)
+                self.fts = True
+            except sqlite3.OperationalError:
+                self.fts = False
+            self._db.commit()
+
+    # --- listings -------------------------------------------------------
+    def get_listing(self, folder_id, with_targets=False, fields=None):
+        """
+        Cached children of folder_id, or None if unknown/stale or if the cached rows
+        lack some of `fields` (None = full api.LIST_FIELDS rows).
+        with_targets=True returns (rows, targets); targets is None if never resolved.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT fetched_at, ttl, rows, targets, fields FROM listings WHERE folder_id=?", (folder_id,)
+            ).fetchone()
+        if not row or (time.time() - row[0] > row[1] and not self._tracked(row[0])):
+            return None
+        if row[4] is not None and (fields is None or not covers(row[4], fields)):
+            return None
+        rows = compact_all(json.loads(row[2]))
+        if with_targets:
+            return rows, (json.loads(row[3]) if row[3] is not None else None)
+        return rows
+
+    def put_targets(self, folder_id, targets):
+        """Record resolved shortcut targets for a cached listing, leaving its rows and projection alone."""
+        with self._lock:
+            self._db.execute("UPDATE listings SET targets=? WHERE folder_id=?", (json.dumps(targets), folder_id))
+            self._db.commit()
+
+    def put_listing(self, folder_id, rows, targets=None, fields=None):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO listings(folder_id, fetched_at, ttl, rows, targets, fields) VALUES (?,?,?,?,?,?)",
+                (folder_id, now, listing_ttl(rows, now), json.dumps(rows, default=plain),
+                 json.dumps(targets) if targets is not None else None, fields),
+            )
+            self._db.executemany(
+                "INSERT OR IGNORE INTO parents(id, parent_id) VALUES (?,?)",
+                [(r["id"], folder_id) for r in rows if r.get("id")],
+            )
+            self._db.execute("DELETE FROM names WHERE parent_id=?", (folder_id,))
+            self._index(self._db, [(r, folder_id) for r in rows])
+            self._db.commit()
+
+    # --- name index (see find) ------------------------------------------
+    @staticmethod
+    def _index(db, pairs):
+        rows = [(r["id"], p, r.get("name") or "", json.dumps(r, default=plain)) for r, p in pairs if r.get("id")]
+        # delete then insert: OR REPLACE wouldn't fire names_ad, leaving stale names_fts rows
+        db.executemany("DELETE FROM names WHERE id=? AND parent_id=?", [r[:2] for r in rows])
+        db.executemany("INSERT INTO names(id, parent_id, name, data) VALUES (?,?,?,?)", rows)
+
+    def index_files(self, files):
+        """Add files carrying `parents` (e.g. from a flat api.iter_files scan) to the name index."""
+        root_id = self.get_state("root_id")
+        pairs = []
+        for f in files:
+            row = {k: v for k, v in f.items() if k != "parents"}
+            pairs.extend((row, "root" if p == root_id else p) for p in (f.get("parents") or ()))
+        with self._lock:
+            self._index(self._db, pairs)
+            self._db.executemany("INSERT OR IGNORE INTO parents(id, parent_id) VALUES (?,?)",
+                                 [(r["id"], p) for r, p in pairs])
+            self._db.commit()
+
+    def find_names(self, substring=None, match=None):
+        """
+        Indexed entries as (row, parent_id). substring uses the trigram index when it has
+        3+ characters; match(name) -> bool filters the rest in Python (globs, regexes).
+        """
+        sql, params = "SELECT data, parent_id FROM names", ()
+        if substring:
+            if self.fts and len(substring) >= 3:
+                sql = ("SELECT data, parent_id FROM names WHERE rowid IN "
+                       "(SELECT rowid FROM names_fts WHERE names_fts MATCH ?)")
+                params = ('"' + substring.replace('"', '""') + '"',)
+            else:
+                esc = substring.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                sql += " WHERE name LIKE ? ESCAPE '\\'"
+                params = (f"%{esc}%",)
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        out = []
+        for data, parent in rows:
+            row = json.loads(data)
+            if match is None or match(row.get("name") or ""):
+                out.append((compact(row), parent))
+        return out
+
+    def names_of(self, ids):
+        """{id: (name, [parent ids])} for the given ids that are in the name index."""
+        ids = list(ids)
+        out = {}
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                marks = ",".join("?" * len(chunk))
+                for fid, name, parent in self._db.execute(
+                    f"SELECT id, name, parent_id FROM names WHERE id IN ({marks})", chunk
+                ):
+                    out.setdefault(fid, (name, []))[1].append(parent)
+        return out
+
+    def ancestry(self, folder_ids):
+        """
+        {folder id: [(id, name), ...] from the folder up to the top-most indexed ancestor}.
+        The chain ends at "root" (My Drive) or at a folder whose parent was never listed.
+        """
+        out = {}
+        root_id = self.get_state("root_id")
+        with self._lock:
+            for fid in folder_ids:
+                chain, cur, seen = [], fid, set()
+                while cur and cur not in seen:
+                    seen.add(cur)
+                    if cur in ("root", root_id):
+                        chain.append(("root", "My Drive")); break
+                    hit = self._db.execute("SELECT parent_id, name FROM names WHERE id=? LIMIT 1", (cur,)).fetchone()
+                    if not hit:
+                        chain.append((cur, None)); break
+                    chain.append((cur, hit[1]))
+                    cur = hit[0]
+                out[fid] = chain
+        return out
+
+    # --- metadata -------------------------------------------------------
+    def get_meta(self, file_id, max_age=MAX_TTL):
+        with self._lock:
+            row = self._db.execute("SELECT fetched_at, data FROM meta WHERE id=?", (file_id,)).fetchone()
+        if not row or time.time() - row[0] > max_age:
+            return None
+        return json.loads(row[1])
+
+    def get_meta_tagged(self, ids):
+        """{id: (etag, meta)} for cached metadata of any age, to revalidate with the server."""
+        out = {}
+        with self._lock:
+            for fid in dict.fromkeys(i for i in ids if i):
+                row = self._db.execute("SELECT etag, data FROM meta WHERE id=?", (fid,)).fetchone()
+                if row:
+                    out[fid] = (row[0], json.loads(row[1]))
+        return out
+
+    def touch_meta(self, ids):
+        """Mark cached metadata as just confirmed unchanged (e.g. after a 304)."""
+        now = time.time()
+        with self._lock:
+            self._db.executemany("UPDATE meta SET fetched_at=? WHERE id=?", [(now, i) for i in ids])
+            self._db.commit()
+
+    def put_meta(self, meta, etag=None):
+        if not meta or not meta.get("id"):
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta(id, fetched_at, data, etag) VALUES (?,?,?,?)",
+                (meta["id"], time.time(), json.dumps(meta), etag),
+            )
+            self._db.executemany(
+                "INSERT OR IGNORE INTO parents(id, parent_id) VALUES (?,?)",
+                [(meta["id"], p) for p in (meta.get("parents") or [])],
+            )
+            self._db.commit()
+
+    # --- parent links ---------------------------------------------------
+    def parent_of(self, file_id):
+        with self._lock:
+            row = self._db.execute("SELECT parent_id FROM parents WHERE id=? LIMIT 1", (file_id,)).fetchone()
+        return row[0] if row else None
+
+    # --- change tracking (see changes.py) -------------------------------
+    def get_state(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT value FROM state WHERE key=?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_state(self, key, value):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO state(key, value) VALUES (?,?)", (key, value))
+            self._db.commit()
+
+    def _tracked(self, fetched_at):
+        since = self.get_state("changes_since") if self.synced else None
+        return since is not None and fetched_at >= float(since)
+
+    def reset_listings(self):
+        """Forget listings and parent links (e.g. after losing the change cursor)."""
+        with self._lock:
+            self._db.execute("DELETE FROM listings")
+            self._db.execute("DELETE FROM parents")
+            self._db.execute("DELETE FROM names")
+            self._db.commit()
+
+    def apply_change(self, file_id, file=None):
+        """
+        Apply one Drive change to cached listings: add, rename/update, move between
+        parents, or remove (file=None for removed/trashed/no longer visible).
+        Returns the ids of the folders whose contents changed.
+        """
+        root_id = self.get_state("root_id")
+        alias = lambda p: "root" if p == root_id else p
+        new = {alias(p) for p in ((file or {}).get("parents") or [])}
+        row = None
+        if file is not None:
+            row = {k: v for k, v in file.items() if k not in ("parents", "trashed")}
+        with self._lock:
+            db = self._db
+            old = {p for (p,) in db.execute("SELECT parent_id FROM parents WHERE id=?", (file_id,))}
+            for p in old | new:
+                hit = db.execute("SELECT rows FROM listings WHERE folder_id=?", (p,)).fetchone()
+                if not hit:
+                    continue
+                rows = [r for r in json.loads(hit[0]) if r.get("id") != file_id]
+                if p in new:
+                    rows.append(row)
+                db.execute("UPDATE listings SET rows=? WHERE folder_id=?", (json.dumps(rows), p))
+            db.execute("DELETE FROM parents WHERE id=?", (file_id,))
+            db.executemany("INSERT OR IGNORE INTO parents(id, parent_id) VALUES (?,?)", [(file_id, p) for p in new])
+            db.execute("DELETE FROM names WHERE id=?", (file_id,))
+            if row is not None:
+                self._index(db, [(row, p) for p in new])
+            db.execute("DELETE FROM meta WHERE id=?", (file_id,))
+            if file is None:
+                db.execute("DELETE FROM listings WHERE folder_id=?", (file_id,))
+            db.commit()
+        return old | new
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,159 @@
+# googleClient/sweep.py
+import argparse, os, re, time, threading, traceback
+from contextlib import redirect_stdout, redirect_stderr
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from google.auth.transport.requests import Request
+
+# refresh a user's token this long before it expires, off the request path
+REFRESH_MARGIN = timedelta(minutes=10)
+DEFAULT_JOBS = 8
+
+def read_users(path):
+    """One email per line; blank lines and # comments ignored; duplicates dropped."""
+    users = []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            u = line.split("#", 1)[0].strip()
+            if u and u not in users:
+                users.append(u)
+    return users
+
+def read_script(run):
+    """--run value: commands separated by ';' or newlines, or @file to read them from a file."""
+    if run.startswith("@"):
+        with open(run[1:], encoding="utf-8") as fh:
+            run = fh.read()
+    lines = [l.strip() for chunk in run.splitlines() for l in chunk.split(";")]
+    return [l for l in lines if l and not l.startswith("#")]
+
+def user_dir(out_root, user):
+    return os.path.join(out_root, re.sub(r'[^A-Za-z0-9_.@-]', '_', user))
+
+def _mint(creds, user):
+    """A valid token for user: the cached one if it has time left, else a fresh JWT grant."""
+    from .auth import load_token, save_token
+    delegated = creds.with_subject(user)
+    if not load_token(delegated):
+        delegated.refresh(Request())
+        save_token(delegated)
+    return delegated.token, delegated.expiry
+
+def _time_left(creds, default):
+    # google-auth keeps expiry as naive UTC
+    if not creds.expiry:
+        return default
+    return creds.expiry.replace(tzinfo=timezone.utc) - datetime.now(timezone.utc)
+
+def _keep_fresh(creds, stop):
+    # refresh shortly before expiry so no Drive call ever waits on the token endpoint
+    while not stop.is_set():
+        left = _time_left(creds, timedelta(0))
+        if left <= REFRESH_MARGIN:
+            try:
+                creds.refresh(Request())
+            except Exception:
+                pass   # the transport refreshes on demand if this keeps failing
+            left = _time_left(creds, timedelta(minutes=1))
+        stop.wait(max(5.0, (left - REFRESH_MARGIN).total_seconds()))
+
+def run_user(key_file, user, lines, out_root, token=None, expiry=None, no_cache=False):
+    """
+    Worker: run the command script as `user` inside its own output directory.
+    stdout/stderr go to <dir>/output.log. Returns (user, commands ok, commands failed, seconds, error).
+    """
+    from .auth import load_credentials, service_for
+    from .repl import Ctx, run_line
+    from .store import MetaStore
+    from . import display
+
+    t0 = time.time()
+    path = user_dir(out_root, user)
+    os.makedirs(path, exist_ok=True)
+    os.chdir(path)   # mget/get without --into land here; each worker is its own process
+    ok = failed = 0
+    stop = threading.Event()
+    ctx = cache = None
+    with open("output.log", "w", encoding="utf-8") as log, redirect_stdout(log), redirect_stderr(log):
+        try:
+            display.init_colors(disable_flag=True)
+            creds = load_credentials(key_file).with_subject(user)
+            if token:
+                creds.token, creds.expiry = token, expiry
+            threading.Thread(target=_keep_fresh, args=(creds, stop), daemon=True).start()
+            cache = MetaStore(user, path=":memory:") if no_cache else None
+            ctx = Ctx(service_for(creds), user, cache=cache)
+            for line in lines:
+                print(f"$ {line}")
+                res = run_line(ctx, line)
+                if res is False:
+                    break
+                if res:
+                    ok += 1
+                else:
+                    failed += 1
+        except BaseException as e:
+            traceback.print_exc()
+            return user, ok, failed, time.time() - t0, str(e) or type(e).__name__
+        finally:
+            stop.set()
+            # the pool reuses this process for other users; don't leave the SQLite handle open
+            if ctx is not None:
+                ctx.cache.close()
+            elif cache is not None:
+                cache.close()
+    return user, ok, failed, time.time() - t0, None
+
+def main(argv):
+    ap = argparse.ArgumentParser(
+        prog="gC sweep",
+        description="Run a command script non-interactively for many users in parallel"
+    )
+    ap.add_argument("--key", required=False,
+        help="Path to service_account.json (omit if using SA_JSON_B64/SA_JSON)")
+    ap.add_argument("--users", required=True, help="File with one user email per line")
+    ap.add_argument("--run", required=True,
+        help="Commands separated by ';' (e.g. \"size --fast; mget * -r\"), or @script.txt")
+    ap.add_argument("--out", default="sweep", help="Output root; one directory per user (default: ./sweep)")
+    ap.add_argument("-j", "--jobs", type=int, default=DEFAULT_JOBS, help=f"Users processed at once (default {DEFAULT_JOBS})")
+    ap.add_argument("--no-cache", action="store_true", help="Keep each user's metadata cache in memory only")
+    args = ap.parse_args(argv)
+
+    from .auth import load_credentials
+    users = read_users(args.users)
+    lines = read_script(args.run)
+    if not users or not lines:
+        print("[!] Nothing to do: no users or no commands."); return 1
+    out_root = os.path.abspath(args.out)
+    os.makedirs(out_root, exist_ok=True)
+    creds = load_credentials(args.key)
+    jobs = max(1, min(args.jobs, len(users)))
+
+    # mint every user's token up front (in parallel) so workers start with a valid one
+    tokens = {}
+    with ThreadPoolExecutor(max_workers=jobs) as tp:
+        futs = {tp.submit(_mint, creds, u): u for u in users}
+        for f in as_completed(futs):
+            try:
+                tokens[futs[f]] = f.result()
+            except Exception as e:
+                print(f"[!] {futs[f]}: token refresh failed ({e}); will retry in worker")
+
+    print(f"Sweeping {len(users)} user(s) with {jobs} worker(s) → {out_root}")
+    done = bad = 0
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futs = [
+            pool.submit(run_user, args.key, u, lines, out_root, *tokens.get(u, (None, None)), args.no_cache)
+            for u in users
+        ]
+        for f in as_completed(futs):
+            user, ok, failed, secs, err = f.result()
+            if err:
+                bad += 1
+                print(f"[!] {user}: {err}  ({secs:.1f}s)")
+            else:
+                done += 1
+                note = f", {failed} failed" if failed else ""
+                print(f"[✓] {user}: {ok} command(s){note}  ({secs:.1f}s)")
+    print(f"[✓] Done: {done} user(s) ok, {bad} failed. Logs in {out_root}/<user>/output.log")
+    return 1 if bad else 0
@@ -0,0 +1,138 @@
+# googleClient/throttle.py
+import os, json, time, random, threading
+from googleapiclient.errors import HttpError
+
+# Drive allows ~12,000 queries per minute per user; stay under it with some headroom.
+RATE = float(os.environ.get("GC_QPS", 150))         # sustained requests/second per user
+BURST = float(os.environ.get("GC_BURST", RATE))     # bucket size
+MAX_INFLIGHT = int(os.environ.get("GC_MAX_INFLIGHT", 32))
+START_INFLIGHT = 8
+MAX_RETRIES = 7
+BASE_DELAY = 1.0
+MAX_DELAY = 64.0
+
+_RATE_REASONS = ("userRateLimitExceeded", "rateLimitExceeded")
+
+def _reason(e):
+    try:
+        body = json.loads(e.content.decode("utf-8") if isinstance(e.content, bytes) else e.content)
+        return (body["error"].get("errors") or [{}])[0].get("reason")
+    except Exception:
+        return None
+
+def is_throttle(e):
+    """True for the quota errors Drive asks clients to back off on."""
+    if not isinstance(e, HttpError):
+        return False
+    status = e.resp.status
+    return status == 429 or (status == 403 and _reason(e) in _RATE_REASONS)
+
+def is_retryable(e):
+    if isinstance(e, (ConnectionError, TimeoutError)):
+        return True
+    return isinstance(e, HttpError) and (is_throttle(e) or e.resp.status in (500, 502, 503, 504))
+
+def _retry_after(e):
+    try:
+        return float(e.resp.get("retry-after"))
+    except Exception:
+        return None
+
+class Controller:
+    """
+    Admission control for one user's Drive calls:
+    a token bucket caps the request rate, an AIMD limit caps concurrent requests
+    (halved on throttling, +1 after a window of clean calls), and retryable
+    errors are retried with jittered exponential backoff.
+    """
+    def __init__(self, rate=RATE, burst=BURST, max_inflight=MAX_INFLIGHT):
+        self.rate = rate
+        self.burst = burst
+        self.max_inflight = max_inflight
+        self.limit = float(min(START_INFLIGHT, max_inflight))
+        self.throttled = 0
+        self.retries = 0
+        self._tokens = burst
+        self._stamp = time.monotonic()
+        self._inflight = 0
+        self._cond = threading.Condition()
+
+    def _take(self, cost):
+        # token bucket; cost > 1 for batch requests (each call inside counts against quota)
+        cost = min(cost, self.burst)
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= cost:
+                    self._tokens -= cost
+                    return
+                self._cond.wait((cost - self._tokens) / self.rate)
+
+    def _enter(self):
+        with self._cond:
+            while self._inflight >= int(self.limit):
+                self._cond.wait()
+            self._inflight += 1
+
+    def _leave(self, ok):
+        with self._cond:
+            self._inflight -= 1
+            if ok:
+                self.limit = min(self.max_inflight, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+    def throttle(self):
+        """Multiplicative decrease after a rate-limit response."""
+        with self._cond:
+            self.throttled += 1
+            self.limit = max(1.0, self.limit / 2)
+
+    def backoff(self, attempt, e=None):
+        """Sleep before retry `attempt` (0-based): full jitter, or the server's Retry-After."""
+        with self._cond:
+            self.retries += 1
+        if e is not None and is_throttle(e):
+            self.throttle()
+        wait = _retry_after(e) if e is not None else None
+        if wait is None:
+            wait = random.uniform(0, min(MAX_DELAY, BASE_DELAY * 2 ** attempt))
+        time.sleep(wait)
+
+    def call(self, fn, *args, cost=1, **kw):
+        """Run fn(*args, **kw) under the rate/concurrency limits, retrying transient failures."""
+        attempt = 0
+        while True:
+            self._take(cost)
+            self._enter()
+            ok = False
+            try:
+                result = fn(*args, **kw)
+                ok = True
+                return result
+            except Exception as e:
+                if attempt >= MAX_RETRIES or not is_retryable(e):
+                    raise
+                err = e
+            finally:
+                self._leave(ok)
+            self.backoff(attempt, err)
+            attempt += 1
+
+_controllers = {}
+_lock = threading.Lock()
+
+def controller(http=None):
+    """The Controller for the user whose credentials back `http` (quotas are per user)."""
+    creds = getattr(http, "credentials", None)
+    key = getattr(creds, "_subject", None)
+    with _lock:
+        c = _controllers.get(key)
+        if c is None:
+            c = _controllers[key] = Controller()
+        return c
+
+def execute(req, http=None):
+    """req.execute() through the controller of the user it runs as."""
+    return controller(http or getattr(req, "http", None)).call(req.execute, http=http)
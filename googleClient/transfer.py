@@ -0,0 +1,190 @@
+# googleClient/transfer.py
+import os, shutil, threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from .api import download_file, worker_http, output_path, ChecksumMismatch
+
+CHECKSUM_RETRIES = 2    # fresh downloads after an MD5 mismatch before giving up
+OBJECTS_DIR = ".gC-objects"
+
+class ObjectStore:
+    """
+    Content-addressed blobs for mget --dedupe, kept under <root>/.gC-objects.
+    Items are keyed by (md5Checksum, size), or by file id when they have no checksum
+    (Google-native exports), so shortcuts to an id already fetched resolve to it too.
+    Each key is downloaded once; every path that wants it becomes a hardlink to the
+    blob (a copy where links aren't possible). Safe to share between download workers.
+    """
+    def __init__(self, root):
+        self.dir = os.path.join(root, OBJECTS_DIR)
+        self.saved = 0      # bytes not downloaded because the content was already here
+        self._lock = threading.Lock()
+        self._blobs = {}    # key -> [done Event, blob path, exception]
+
+    @staticmethod
+    def key(item):
+        md5, size = item.get("md5Checksum"), item.get("size")
+        return f"{md5}-{size}" if md5 and size is not None else f"id-{item['id']}"
+
+    def blob(self, item, download):
+        """
+        (blob path, fetched) for item's content. The first caller for a key runs
+        download(blob_item, self.dir) (others wait for it) under a temporary name and
+        moves it into place only once it returned, i.e. passed the md5 check; so a
+        checksummed blob left by an earlier run is complete and reused as is.
+        """
+        k = self.key(item)
+        with self._lock:
+            slot = self._blobs.get(k)
+            first = slot is None
+            if first:
+                slot = self._blobs[k] = [threading.Event(), None, None]
+        if not first:
+            slot[0].wait()
+            if slot[2] is not None:
+                raise slot[2]
+            self._count_saved(item)
+            return slot[1], False
+        try:
+            path = output_path(dict(item, name=f"{k}.blob"), self.dir)
+            reuse = (not k.startswith("id-") and os.path.exists(path)
+                     and os.path.getsize(path) == int(item["size"]))
+            if reuse:
+                self._count_saved(item)
+            else:
+                part_item = dict(item, name=f"{k}.part")
+                part = output_path(part_item, self.dir)
+                try:
+                    download(part_item, self.dir)
+                    os.replace(part, path)
+                except BaseException:
+                    # a .part is never resumed, so don't leave it behind
+                    try:
+                        os.remove(part)
+                    except OSError:
+                        pass
+                    raise
+            slot[1] = path
+            return path, not reuse
+        except Exception as e:
+            slot[2] = e
+            raise
+        finally:
+            slot[0].set()
+
+    def _count_saved(self, item):
+        with self._lock:
+            self.saved += int(item.get("size") or 0)
+
+    @staticmethod
+    def place(blob, dest):
+        """Make dest a hardlink to blob (or a copy of it)."""
+        os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+        if os.path.exists(dest):
+            if os.path.samefile(blob, dest):
+                return
+            os.remove(dest)
+        try:
+            os.link(blob, dest)
+        except OSError:
+            shutil.copyfile(blob, dest)
+
+class DownloadPool:
+    """
+    Run download_file across a pool of worker threads.
+    Workers get their transport from api.worker_http (the shared pool, or one per thread).
+    jobs=1 downloads inline on the caller's thread, exactly like before.
+    With a journal (journal.DownloadJournal), unchanged files are skipped and
+    partial ones resumed. Files whose MD5 doesn't match Drive's are downloaded
+    again from scratch, up to CHECKSUM_RETRIES times. With an ObjectStore, each
+    distinct content is downloaded once and linked into every path that wants it.
+    """
+    def __init__(self, svc, jobs=1, journal=None, objects=None):
+        self.svc = svc
+        self.jobs = max(1, int(jobs))
+        self.journal = journal
+        self.objects = objects
+        self.ok = 0
+        self.failed = 0
+        self.unchanged = 0
+        self.resumed = 0
+        self.redownloaded = 0
+        self.linked = 0
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._pool = None
+        if self.jobs > 1:
+            self._pool = ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="gC-dl")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def submit(self, item, outdir, label):
+        if self._pool is None:
+            self._run(item, outdir, label, None)
+            return
+        # keep the backlog bounded so a huge traversal doesn't queue millions of futures
+        while len(self._pending) >= self.jobs * 4:
+            _done, self._pending = wait(self._pending, return_when=FIRST_COMPLETED)
+        self._pending.add(self._pool.submit(self._run, item, outdir, label, True))
+
+    def close(self):
+        if self._pool is None:
+            return
+        wait(self._pending)
+        self._pending = set()
+        self._pool.shutdown(wait=True)
+        self._pool = None
+
+    def _download(self, item, outdir, label, http, offset=0):
+        for attempt in range(CHECKSUM_RETRIES + 1):
+            try:
+                download_file(self.svc, item, outdir=outdir, http=http, resume_from=offset)
+                return
+            except ChecksumMismatch:
+                if attempt >= CHECKSUM_RETRIES:
+                    raise
+                with self._lock:
+                    self.redownloaded += 1
+                    print(f"   [!] checksum mismatch for {label}; downloading again")
+                offset = 0
+
+    def _run(self, item, outdir, label, threaded):
+        http = worker_http(self.svc) if threaded else None
+        fetched = True
+        try:
+            offset = 0
+            path = output_path(item, outdir)
+            if self.journal is not None:
+                action, offset = self.journal.check(item, path)
+                if action == "skip":
+                    with self._lock:
+                        self.unchanged += 1
+                    return
+                if action != "resume" or self.objects is not None:
+                    offset = 0
+                    self.journal.begin(item, path)
+            if self.objects is not None:
+                blob, fetched = self.objects.blob(item, lambda b, d: self._download(b, d, label, http))
+                self.objects.place(blob, path)
+            else:
+                self._download(item, outdir, label, http, offset)
+            if self.journal is not None:
+                self.journal.finish(item["id"], path)
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+                print(f"   [!] failed {label}: {e}")
+            return
+        with self._lock:
+            self.ok += 1
+            if not fetched:
+                self.linked += 1
+                print(f"= {label}  (same content as another file)")
+            elif offset:
+                self.resumed += 1
+                print(f"↓ {label}  (resumed at {offset} bytes)")
+            else:
+                print(f"↓ {label}")
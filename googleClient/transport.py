@@ -0,0 +1,55 @@
+# googleClient/transport.py
+import os
+import httplib2
+import requests
+from requests.adapters import HTTPAdapter
+from google.auth.transport.requests import AuthorizedSession
+from .throttle import MAX_INFLIGHT
+
+# keep-alive connections kept per host; enough for every call the throttle lets through at once
+POOL_SIZE = int(os.environ.get("GC_POOL_SIZE", MAX_INFLIGHT))
+POOL_HOSTS = 4          # distinct hosts with a pool (www.googleapis.com, oauth2, ...)
+TIMEOUT = float(os.environ.get("GC_HTTP_TIMEOUT", 120))
+
+def pooled():
+    """True unless GC_TRANSPORT=httplib2 asks for the old one-connection-per-thread transport."""
+    return os.environ.get("GC_TRANSPORT", "pooled").lower() != "httplib2"
+
+class PooledHttp:
+    """
+    httplib2-compatible front for a requests AuthorizedSession, so googleapiclient
+    (plain calls, batches, media downloads) can run on a connection pool.
+    Thread-safe: one instance per user is shared by the shell and all workers, and
+    connections (and their TLS sessions) are reused across calls and threads.
+    At most POOL_SIZE connections are kept open per host; callers beyond that wait.
+    """
+    def __init__(self, creds, pool_size=POOL_SIZE, timeout=TIMEOUT):
+        self.credentials = creds
+        self.timeout = timeout
+        self._session = AuthorizedSession(creds)
+        adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=pool_size, pool_block=True, max_retries=0)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def request(self, uri, method="GET", body=None, headers=None, redirections=5, connection_type=None):
+        try:
+            r = self._session.request(method, uri, data=body, headers=headers,
+                                      timeout=self.timeout, allow_redirects=redirections > 0)
+        except requests.Timeout as e:
+            raise TimeoutError(str(e)) from e
+        except requests.ConnectionError as e:
+            # builtin type, so throttle.is_retryable and googleapiclient retry it
+            raise ConnectionError(str(e)) from e
+        content = r.content
+        info = {k.lower(): v for k, v in r.headers.items()}
+        if "content-encoding" in info:
+            # requests already decoded the body; report it the way httplib2 does
+            info["-content-encoding"] = info.pop("content-encoding")
+            info["content-length"] = str(len(content))
+        info["status"] = str(r.status_code)
+        resp = httplib2.Response(info)
+        resp.reason = r.reason
+        return resp, content
+
+    def close(self):
+        self._session.close()
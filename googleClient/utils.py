@@ -36,6 +36,31 @@ def select_by_glob(pattern: str, items):
             idxs.append(i)
     return idxs
 
+def has_index(items, idx: int) -> bool:
+    """0 <= idx < len(items), without loading a whole paged.PagedListing to find out."""
+    if hasattr(items, "has"):
+        return idx >= 0 and items.has(idx)
+    return 0 <= idx < len(items)
+
+def selection_bound(sel: str, items) -> int:
+    """
+    max_index for parse_selection(sel, ...): len(items), except that a lazily paged
+    view is only loaded as far as the highest number in sel.
+    """
+    nums = [int(n) for n in re.findall(r'\d+', sel)]
+    if hasattr(items, "has") and nums and items.has(max(nums) - 1):
+        return items.loaded
+    return len(items)
+
+def select_indices(sel: str, items):
+    """0-based indices for '*', a glob, or a #/#-#/#,#,... selection against items."""
+    s = sel.strip()
+    if s == "*":
+        return list(range(len(items)))
+    if any(ch in s for ch in "*?[]"):
+        return select_by_glob(s, items)
+    return parse_selection(s, selection_bound(s, items))
+
 def normalize_compact_flags(args, int_flags=("-L",), assign_flags=("--into",)):
     """
     Expand compact flags so '-L1' -> ['-L','1'] and '--into=/x' -> ['--into','/x'].
@@ -69,3 +94,42 @@ def normalize_compact_flags(args, int_flags=("-L",), assign_flags=("--into",)):
 
         out.append(a)
     return out
+
+def human_size(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n} B" if unit == "B" else f"{n:.2f} {unit}"
+        n /= 1024.0
+
+def file_md5(path, limit=None, block=1 << 20):
+    """Hex MD5 of a file (of its first `limit` bytes if given)."""
+    md5 = hashlib.md5()
+    left = limit
+    with open(path, "rb") as fh:
+        while left is None or left > 0:
+            buf = fh.read(block if left is None else min(block, left))
+            if not buf:
+                break
+            md5.update(buf)
+            if left is not None:
+                left -= len(buf)
+    return md5.hexdigest()
+
+def pop_jobs_flag(args, default=1):
+    """
+    Remove '-j N' / '--jobs N' from args (already normalized) and return (jobs, rest).
+    Raises ValueError on a missing or non-positive count.
+    """
+    jobs, rest = default, []
+    i = 0
+    while i < len(args):
+        a = args[i]
+        if a in ("-j", "--jobs"):
+            if i + 1 >= len(args) or not args[i+1].isdigit() or int(args[i+1]) < 1:
+                raise ValueError(f"{a} requires a positive integer")
+            jobs = int(args[i+1])
+            i += 2
+            continue
+        rest.append(a)
+        i += 1
+    return jobs, rest
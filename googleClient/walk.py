@@ -0,0 +1,112 @@
+# googleClient/walk.py
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from .api import list_all, worker_http, WALK_FIELDS
+from .batch import resolve_shortcuts
+from .constants import FOLDER, SHORTCUT
+from .throttle import controller, MAX_INFLIGHT
+
+DEFAULT_WORKERS = MAX_INFLIGHT   # upper bound; the throttle controller sets the actual pace
+
+# folder: the listed folder item; depth: 0 for roots
+# children: raw child items; targets: shortcut id -> target meta (or None if broken)
+Listing = namedtuple("Listing", "folder depth children targets")
+
+def _fetch(svc, folder, follow_shortcuts, fields, children=None):
+    http = worker_http(svc)
+    if children is None:
+        children = list_all(svc, folder["id"], http=http, fields=fields)
+    targets = resolve_shortcuts(svc, children, http=http) if follow_shortcuts else {}
+    return children, targets
+
+def walk(svc, roots, max_depth=None, follow_shortcuts=False, workers=DEFAULT_WORKERS, store=None,
+         fields=WALK_FIELDS):
+    """
+    Iterative, concurrent folder traversal.
+    Lists up to `workers` folders at once (fewer while the user's throttle.Controller
+    has backed off) and yields a Listing per folder as it arrives
+    (completion order; a parent is always yielded before its children).
+    Folders at depth >= max_depth are not listed (None = unlimited).
+    Each folder id is listed once, so shortcut cycles terminate.
+    With a store (store.MetaStore), fresh cached listings are served without a
+    round-trip and new listings are written through.
+    `fields` is the projection requested for children (see api.WALK_FIELDS).
+    """
+    best = {}        # folder id -> shallowest depth reached
+    listed = {}      # folder id -> (children, targets)
+    pending = deque()
+    inflight = {}    # future -> (folder, True if only its shortcut targets are being fetched)
+    ready = deque()  # (folder, children, targets) waiting to be yielded
+
+    def reach(folder, depth):
+        work = [(folder, depth)]
+        while work:
+            f, d = work.pop()
+            fid = f["id"]
+            if max_depth is not None and d >= max_depth:
+                continue
+            if fid in best and best[fid] <= d:
+                continue
+            first = fid not in best
+            best[fid] = d
+            if fid not in listed:
+                if first:
+                    pending.append(f)
+                continue
+            # reached again at a shallower depth: re-expand from what we already have
+            children, targets = listed[fid]
+            work.extend((c, d + 1) for c in _subfolders(children, targets))
+
+    ctl = controller(getattr(svc, "_http", None))
+    pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="gC-walk")
+    try:
+        for r in roots:
+            reach(r, 0)
+        while pending or inflight or ready:
+            # follow the controller's AIMD limit so throttling also slows dispatch
+            width = max(1, min(workers, int(ctl.limit)))
+            while pending and len(inflight) < width:
+                f = pending.popleft()
+                rows = None
+                if store is not None:
+                    hit = store.get_listing(f["id"], with_targets=True, fields=fields)
+                    if hit:
+                        rows, targets = hit
+                        if targets is not None or not follow_shortcuts or not _has_shortcut(rows):
+                            ready.append((f, rows, targets or {}))
+                            continue
+                # cached rows whose shortcuts were never resolved only need the targets fetched
+                inflight[pool.submit(_fetch, svc, f, follow_shortcuts, fields, rows)] = (f, rows is not None)
+            if not ready:
+                done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    folder, cached = inflight.pop(fut)
+                    children, targets = fut.result()
+                    if store is not None and cached:
+                        # the cached rows may carry more fields than `fields`; keep them as they are
+                        store.put_targets(folder["id"], targets)
+                    elif store is not None:
+                        store.put_listing(folder["id"], children, targets if follow_shortcuts else None, fields)
+                    ready.append((folder, children, targets))
+            while ready:
+                folder, children, targets = ready.popleft()
+                fid = folder["id"]
+                listed[fid] = (children, targets)
+                for c in _subfolders(children, targets):
+                    reach(c, best[fid] + 1)
+                yield Listing(folder, best[fid], children, targets)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def _has_shortcut(rows):
+    return any(r.get("mimeType") == SHORTCUT for r in rows)
+
+def _subfolders(children, targets):
+    for c in children:
+        mt = c.get("mimeType")
+        if mt == FOLDER:
+            yield c
+        elif mt == SHORTCUT:
+            t = targets.get(c["id"])
+            if t and t.get("mimeType") == FOLDER:
+                yield t
@@ -0,0 +1,14 @@
+from googleClient.store import MetaStore
+
+def test_reindex_keeps_one_fts_row_per_name():
+    store = MetaStore("test@example.com", path=":memory:")
+    if not store.fts:
+        return   # SQLite without FTS5 trigram: nothing to check
+    files = [{"id": f"f{i}", "name": f"report-{i}.pdf", "parents": ["p"]} for i in range(3)]
+    for _ in range(3):
+        store.index_files(files)
+    db = store._db
+    assert db.execute("SELECT count(*) FROM names").fetchone()[0] == 3
+    assert db.execute("SELECT count(*) FROM names_fts_docsize").fetchone()[0] == 3
+    db.execute("INSERT INTO names_fts(names_fts) VALUES ('integrity-check')")
+    assert len(store.find_names("report")) == 3